@@ -0,0 +1,129 @@
+# backend/app/admission.py
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+# Kapsam -> (saniyede jeton, kova boyu). Anahtar: kullanıcı, oturum kimliği veya istemci IP'si.
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "ping": (1.0, 10),          # oturum başına; oynatıcı ~5-10 sn'de bir ping atar
+    "ping_ip": (10.0, 50),      # IP başına; session_id değiştirerek sınırı aşmayı engeller,
+                                # NAT arkasındaki (okul/ofis) onlarca izleyiciye yeter
+    "highlights": (0.5, 10),    # oturum başına
+    "notes": (0.5, 10),         # kullanıcı başına
+    "query_check": (0.5, 5),    # kullanıcı başına
+}
+# Upstream başına aynı anda çalışabilecek en fazla yazma isteği
+UPSTREAM_CONCURRENCY: Dict[str, int] = {
+    "supabase": 8,
+}
+# Eşzamanlılık sınırı dolduğunda istemciye önerilen bekleme (saniye)
+SHED_RETRY_AFTER_SECONDS = 1
+# Bir kapsamda tutulan en fazla anahtar (kesin üst sınır); dolduğunda en uzun
+# süredir dokunulmayan anahtar çıkarılır
+MAX_KEYS_PER_SCOPE = 100_000
+
+
+class TooManyRequests(HTTPException):
+    """İstek, Supabase'e ulaşmadan önce yük atma / hız sınırıyla reddedildi."""
+
+    def __init__(self, retry_after: float, reason: str) -> None:
+        super().__init__(
+            status_code=429,
+            detail=f"Çok fazla istek ({reason}), lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class TokenBuckets:
+    """
+    Anahtar başına jeton kovası: key -> (jeton, son güncelleme) çifti.
+    Kovalar son dokunulma sırasıyla (LRU) tutulur. Boşta kalan bir kova
+    `burst / rate` saniyede zaten dolacağından bu süreden uzun dokunulmayan
+    anahtarlar baştan silinir; sonuç değişmez. Her `take` en fazla birkaç
+    anahtar temizler ve anahtar sayısı `max_keys`'i asla aşmaz.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = MAX_KEYS_PER_SCOPE) -> None:
+        self.rate = rate
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._idle = self.burst / rate
+        self._state: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Jeton varsa harcar ve 0 döner; yoksa bir jeton için beklenecek süreyi döner."""
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            state = self._state.pop(key, None)
+            if state is None:
+                if len(self._state) >= self.max_keys:
+                    # Boşta kova kalmadı: en uzun süredir dokunulmayan çıkarılır
+                    self._state.popitem(last=False)
+                state = (self.burst, now)
+            tokens, last = state
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._state[key] = (tokens - 1.0, now)
+                return 0.0
+            self._state[key] = (tokens, now)
+            return (1.0 - tokens) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        # Sıra son dokunulmaya göre olduğundan boşta kalanlar hep baştadır;
+        # ilk taze kovada durulur (her anahtar bir kez silindiği için amortize O(1))
+        cutoff = now - self._idle
+        while self._state:
+            key, (_, last) = next(iter(self._state.items()))
+            if last > cutoff:
+                return
+            del self._state[key]
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+_buckets: Dict[str, TokenBuckets] = {
+    scope: TokenBuckets(rate, burst) for scope, (rate, burst) in RATE_LIMITS.items()
+}
+_slots: Dict[str, threading.BoundedSemaphore] = {
+    name: threading.BoundedSemaphore(limit) for name, limit in UPSTREAM_CONCURRENCY.items()
+}
+
+
+def client_ip(request: Request) -> str:
+    """
+    İstemci IP'si (IP başına hız sınırı anahtarı). Proxy arkasında uvicorn
+    `--proxy-headers` ile çalıştırılmalıdır; X-Forwarded-For burada okunmaz,
+    çünkü istemci tarafından sahte değer yazılabilir.
+    """
+    return request.client.host if request.client else ""
+
+
+@contextmanager
+def admit(scope: str, key: Optional[str], upstream: Optional[str] = None) -> Iterator[None]:
+    """
+    Yazma isteğini kabul eder veya 429 ile reddeder:
+    1) `scope` içinde `key` (kullanıcı/oturum) kovasından bir jeton harcanır,
+    2) `upstream` verilirse o upstream'in eşzamanlılık yuvası beklemeden alınır.
+    Reddedilen istek Supabase'e hiç ulaşmaz; okumalar bu sınırlardan etkilenmez.
+    """
+    wait_for = _buckets[scope].take(key or "")
+    if wait_for > 0:
+        raise TooManyRequests(wait_for, "hız sınırı")
+    if upstream is None:
+        yield
+        return
+    slot = _slots[upstream]
+    if not slot.acquire(blocking=False):
+        raise TooManyRequests(SHED_RETRY_AFTER_SECONDS, f"{upstream} yoğun")
+    try:
+        yield
+    finally:
+        slot.release()
@@ -0,0 +1,61 @@
+# backend/app/bulk.py
+import re
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+
+# Tek istekte kabul edilen en fazla öğe (in_ filtresi URL'e yazıldığı için sınırlı)
+MAX_BULK_ITEMS = 200
+
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def strip_text(value: Any) -> Optional[str]:
+    value = (value or "").strip() if isinstance(value, str) else None
+    return value or None
+
+
+def video_id(value: Any) -> Optional[str]:
+    value = strip_text(value)
+    return value if value and _VIDEO_ID_RE.match(value) else None
+
+
+def validate(
+    items: Sequence[Any],
+    normalize: Callable[[Any], Optional[Hashable]] = strip_text,
+    label: Callable[[Any], Any] = lambda v: v,
+) -> Tuple[List[Hashable], List[Dict[str, Any]]]:
+    """
+    Toplu isteklerin tek doğrulama geçişi: geçersiz ve tekrar eden öğeleri ayıklar.
+    (geçerli değerler, girdi sırasıyla sonuçlar) döner; geçerli öğelerin
+    `status` alanı veritabanı işleminden sonra `finish` ile doldurulur.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="En az bir öğe gönderilmelidir.")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {MAX_BULK_ITEMS} öğe gönderilebilir.")
+
+    seen: Set[Hashable] = set()
+    valid: List[Hashable] = []
+    results: List[Dict[str, Any]] = []
+    for raw in items:
+        value = normalize(raw)
+        if value is None:
+            results.append({"item": raw, "status": "invalid"})
+        elif value in seen:
+            results.append({"item": label(value), "status": "duplicate", "_key": value})
+        else:
+            seen.add(value)
+            valid.append(value)
+            results.append({"item": label(value), "status": None, "_key": value})
+    return valid, results
+
+
+def finish(results: List[Dict[str, Any]], done: Iterable[Hashable], ok: str, missing: str) -> Dict[str, Any]:
+    """Geçerli öğelere işlem sonucunu yazar ve yanıt gövdesini üretir."""
+    done = set(done)
+    for r in results:
+        key = r.pop("_key", None)
+        if r["status"] is None:
+            r["status"] = ok if key in done else missing
+    return {"ok": sum(1 for r in results if r["status"] == ok), "results": results}
@@ -0,0 +1,332 @@
+# backend/app/chapters.py
+import bisect
+import hashlib
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .supabase_client import supabase, execute
+
+# "1:02:03 Başlık" / "02:03 - Başlık" satırları (modül yüklenirken bir kez derlenir)
+_CHAPTER_RE = re.compile(r"^(?P<time>(?:\d+:)?\d{1,2}:\d{2})\s*(?P<title>.+)$")
+_TOKEN_RE = re.compile(r"\w+")
+# Aramada Türkçe karakterler ASCII karşılıklarıyla eşleşir ("ozellik" -> "özellik")
+_FOLD = str.maketrans("ıçğöşüâîû", "icgosuaiu")
+
+# Kalıcılaştırma: bu kadar video birikince veya bu süre dolunca tek seferde yazılır
+BATCH_SIZE = 200
+FLUSH_SECONDS = 5
+# Supabase tek istekte en fazla bu kadar satır döndürür
+PAGE_SIZE = 1000
+# Bölümsüz videolar için yazılan işaret satırının start_seconds değeri: açıklama
+# hash'i kalıcı olur, böylece bu videolar her açılışta yeniden ayrıştırılmaz
+NO_CHAPTERS = -1
+# sync_watermarks tablosunda geri doldurmanın videos.updated_at filigranı
+BACKFILL_WATERMARK = "chapters_backfill"
+
+ChapterKey = Tuple[str, int]  # (video_id, start_seconds)
+
+
+def parse_chapters(description: str) -> List[Dict[str, Any]]:
+    """
+    Video açıklamasından YouTube tarzı chapters (bölümler) çıkarır.
+    """
+    chapters = []
+    for line in (description or "").splitlines():
+        m = _CHAPTER_RE.match(line.strip())
+        if m:
+            parts = list(map(int, m.group("time").split(":")))
+            if len(parts) == 3:
+                seconds = parts[0]*3600 + parts[1]*60 + parts[2]
+            elif len(parts) == 2:
+                seconds = parts[0]*60 + parts[1]
+            else:
+                continue
+            chapters.append({"start_seconds": seconds, "title": m.group("title").strip()})
+    return chapters
+
+
+def description_hash(description: Optional[str]) -> str:
+    return hashlib.blake2b((description or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _fold(text: str) -> str:
+    return text.replace("I", "ı").replace("İ", "i").lower().translate(_FOLD)
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(_fold(text or ""))
+
+
+# ---------------------------
+#   Bellek içi başlık indeksi
+# ---------------------------
+class ChapterIndex:
+    """
+    Bölüm başlıkları için ters indeks (kelime -> bölüm anahtarları).
+    Son kelime önek olarak eşleşir; kelime listesi sıralı tutulduğundan
+    önek genişletme bisect ile yapılır.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_video: Dict[str, List[Dict[str, Any]]] = {}
+        self._titles: Dict[ChapterKey, str] = {}
+        self._postings: Dict[str, Set[ChapterKey]] = {}
+        self._sorted_tokens: List[str] = []
+        self._tokens_dirty = False
+
+    def replace(self, video_id: str, chapters: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for ch in self._by_video.pop(video_id, []):
+                key = (video_id, ch["start_seconds"])
+                self._titles.pop(key, None)
+                for tok in _tokens(ch["title"]):
+                    keys = self._postings.get(tok)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self._postings[tok]
+                            self._tokens_dirty = True
+            if not chapters:
+                return
+            self._by_video[video_id] = chapters
+            for ch in chapters:
+                key = (video_id, ch["start_seconds"])
+                self._titles[key] = ch["title"]
+                for tok in _tokens(ch["title"]):
+                    if tok not in self._postings:
+                        self._postings[tok] = set()
+                        self._tokens_dirty = True
+                    self._postings[tok].add(key)
+
+    def for_video(self, video_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            return self._by_video.get(video_id)
+
+    def _prefixed(self, prefix: str) -> Iterable[str]:
+        if self._tokens_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._tokens_dirty = False
+        i = bisect.bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            yield self._sorted_tokens[i]
+            i += 1
+
+    def search(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Tüm kelimeleri içeren bölümleri döner; tam kelime eşleşmesi ve kısa başlık öne çıkar."""
+        words = _tokens(text)
+        if not words:
+            return []
+        with self._lock:
+            exact: Dict[ChapterKey, int] = {}
+            candidates: Optional[Set[ChapterKey]] = None
+            for n, word in enumerate(words):
+                matched = set(self._postings.get(word, ()))
+                for key in matched:
+                    exact[key] = exact.get(key, 0) + 1
+                if n == len(words) - 1:
+                    for tok in self._prefixed(word):
+                        matched |= self._postings[tok]
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+            hits = [(key, self._titles[key]) for key in candidates]
+        hits.sort(key=lambda h: (-exact.get(h[0], 0), len(h[1]), h[0]))
+        return [
+            {"video_id": vid, "start_seconds": start, "title": title}
+            for (vid, start), title in hits[:limit]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+
+# ---------------------------
+#   Çıkarma + kalıcılaştırma hattı
+# ---------------------------
+class ChapterPipeline:
+    """
+    Sadece açıklaması yeni/değişmiş videoları ayrıştırır; sonuçlar bellekteki
+    indekse hemen, `video_chapters` tablosuna ((video_id, start_seconds) anahtarlı)
+    arka planda toplu olarak yazılır. Bölümsüz videolar için tek bir
+    NO_CHAPTERS işaret satırı yazılır; indekse girmez, sadece hash'i taşır.
+    """
+
+    def __init__(self) -> None:
+        self.index = ChapterIndex()
+        # video_id -> en son ayrıştırılan açıklamanın hash'i
+        self._hashes: Dict[str, str] = {}
+        self._pending: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def extract(self, items: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        (video_id, açıklama) çiftleri için bölümleri döner. Hash'i bilinen
+        açıklamalar yeniden ayrıştırılmaz; yeni/değişenler yazma kuyruğuna eklenir.
+        """
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        changed = 0
+        for video_id, description in items:
+            h = description_hash(description)
+            with self._lock:
+                known = self._hashes.get(video_id) == h
+            if known:
+                out[video_id] = self.index.for_video(video_id) or []
+                continue
+            chapters = parse_chapters(description)
+            out[video_id] = chapters
+            self.index.replace(video_id, chapters)
+            with self._lock:
+                self._hashes[video_id] = h
+                self._pending[video_id] = (h, chapters)
+                changed = len(self._pending)
+        if changed >= BATCH_SIZE:
+            self._wake.set()
+        return out
+
+    def flush(self) -> int:
+        """Bekleyen tüm videoları tek upsert + tek (video başına koşullu) eski-satır silmesiyle yazar."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        rows = []
+        for video_id, (h, chapters) in batch.items():
+            seen: Set[int] = set()
+            for ch in chapters:
+                # Aynı zaman damgası iki kez yazılamaz (birleşik anahtar)
+                if ch["start_seconds"] in seen:
+                    continue
+                seen.add(ch["start_seconds"])
+                rows.append({
+                    "video_id": video_id,
+                    "start_seconds": ch["start_seconds"],
+                    "title": ch["title"],
+                    "description_hash": h,
+                })
+            if not chapters:
+                rows.append({"video_id": video_id, "start_seconds": NO_CHAPTERS, "title": "", "description_hash": h})
+        try:
+            execute(supabase.table("video_chapters").upsert(rows, on_conflict="video_id,start_seconds"))
+            # Açıklaması değişen videoların artık geçersiz bölümlerini sil. Koşul video
+            # başınadır: başka bir videonun güncel hash'i (ör. şablon/boş açıklama)
+            # bu videonun eski satırlarını korumamalı. Aynı hash'li videolar tek koşulda.
+            by_hash: Dict[str, List[str]] = {}
+            for video_id, (h, _) in batch.items():
+                by_hash.setdefault(h, []).append(video_id)
+            clauses = ",".join(
+                f"and(video_id.in.({','.join(sorted(ids))}),description_hash.neq.{h})"
+                for h, ids in sorted(by_hash.items())
+            )
+            execute(supabase.table("video_chapters").delete().or_(clauses))
+        except Exception as e:
+            print(f"Bölümler yazılırken hata oluştu: {e}")
+            with self._lock:
+                for video_id, entry in batch.items():
+                    self._pending.setdefault(video_id, entry)
+            return 0
+        return len(batch)
+
+    # ---------------------------
+    #   Yükleme ve geri doldurma
+    # ---------------------------
+    def load(self) -> None:
+        """Kalıcı bölümlerden (ve bölümsüz video işaretlerinden) indeksi ve bilinen hash'leri kurar."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        hashes: Dict[str, str] = {}
+        start = 0
+        while True:
+            page = execute(
+                supabase.table("video_chapters")
+                .select("video_id,start_seconds,title,description_hash")
+                .order("video_id")
+                .order("start_seconds")
+                .range(start, start + PAGE_SIZE - 1),
+                idempotent=True,
+            ).data or []
+            for row in page:
+                hashes[row["video_id"]] = row.get("description_hash") or ""
+                if row["start_seconds"] == NO_CHAPTERS:
+                    continue
+                grouped.setdefault(row["video_id"], []).append(
+                    {"start_seconds": row["start_seconds"], "title": row["title"]}
+                )
+            if len(page) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+        for video_id, chapters in grouped.items():
+            self.index.replace(video_id, chapters)
+        with self._lock:
+            for video_id, h in hashes.items():
+                self._hashes.setdefault(video_id, h)
+
+    def backfill(self) -> None:
+        """
+        Sadece son geri doldurmadan sonra yazılmış/güncellenmiş videoları
+        (videos.updated_at filigranından itibaren) tarar; bunlardan da sadece
+        açıklaması değişenler ayrıştırılır. Filigran her sayfa kalıcılaştıktan
+        sonra `sync_watermarks` tablosuna yazılır; ilk açılışta tüm katalog taranır.
+        """
+        rows = execute(
+            supabase.table("sync_watermarks").select("watermark").eq("name", BACKFILL_WATERMARK),
+            idempotent=True,
+        ).data or []
+        cursor: Optional[Tuple[str, str]] = None
+        watermark = rows[0]["watermark"] if rows else None
+        while not self._stop.is_set():
+            q = supabase.table("videos").select("video_id,description,updated_at")
+            if cursor:
+                # (updated_at, video_id) > imleç; taranırken güncellenen satırlar sona kayar, atlanmaz
+                u, v = cursor
+                q = q.or_(f'updated_at.gt."{u}",and(updated_at.eq."{u}",video_id.gt."{v}")')
+            elif watermark:
+                # gte: aynı zaman damgasıyla sonradan yazılan satırlar kaçmasın (tekrarlar hash ile elenir)
+                q = q.gte("updated_at", watermark)
+            page = execute(
+                q.order("updated_at").order("video_id").limit(PAGE_SIZE), idempotent=True
+            ).data or []
+            if not page:
+                return
+            self.extract((r["video_id"], r.get("description")) for r in page)
+            self.flush()
+            cursor = (page[-1]["updated_at"], page[-1]["video_id"])
+            with self._lock:
+                persisted = not self._pending
+            if persisted:
+                # Yazma başarısızsa filigran ilerlemez; sonraki açılış bu sayfadan devam eder
+                execute(supabase.table("sync_watermarks").upsert(
+                    {"name": BACKFILL_WATERMARK, "watermark": cursor[0]}, on_conflict="name"
+                ))
+            if len(page) < PAGE_SIZE:
+                return
+
+    def _run(self) -> None:
+        try:
+            self.load()
+            self.backfill()
+        except Exception as e:
+            print(f"Bölüm indeksi yüklenirken hata oluştu: {e}")
+        while not self._stop.is_set():
+            self._wake.wait(FLUSH_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chapters", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Kapanışta bekleyen bölümleri yazar."""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+
+chapter_pipeline = ChapterPipeline()
@@ -0,0 +1,103 @@
+# backend/app/encoding.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+# orjson kuruluysa çok daha hızlı serileştirme yapar; yoksa standart json
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # pragma: no cover - opsiyonel bağımlılık
+    FastJSONResponse = JSONResponse
+
+# brotli-asgi kuruluysa br + gzip, değilse sadece gzip
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - opsiyonel bağımlılık
+    BrotliMiddleware = None
+
+# Bu boyutun altındaki gövdeleri sıkıştırmak CPU israfı
+COMPRESS_MIN_SIZE = 1024
+
+# `videos` tablosunun seçilebilir kolonları
+VIDEO_FIELDS = (
+    "video_id",
+    "title",
+    "description",
+    "thumbnail",
+    "published_at",
+    "channel_title",
+    "channel_id",
+    "channel_thumbnail",
+    "duration",
+    "duration_seconds",
+    "published_ts",
+    "query_key",
+    "query",
+    "chapters",
+)
+
+# Kopyalanmaması gereken (gövdeye bağlı) başlıklar
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def install_compression(app: FastAPI) -> None:
+    """İstemcinin Accept-Encoding başlığına göre br/gzip sıkıştırmayı etkinleştirir."""
+    if BrotliMiddleware is not None:
+        app.add_middleware(BrotliMiddleware, minimum_size=COMPRESS_MIN_SIZE, gzip_fallback=True)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """
+    İçeriği doğrudan hızlı JSON yanıtına çevirir (jsonable_encoder adımını atlar).
+    `response` verilirse üzerine yazılmış başlıklar (ETag vb.) korunur.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _BODY_HEADERS}
+    return FastJSONResponse(content, headers=headers)
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Sequence[str] = VIDEO_FIELDS,
+    required: Sequence[str] = ("video_id",),
+) -> Optional[List[str]]:
+    """
+    `fields=title,thumbnail` parametresini doğrular.
+    None dönerse tüm kolonlar istenmiştir.
+    """
+    if not fields:
+        return None
+    cols: List[str] = list(required)
+    unknown = []
+    for f in fields.split(","):
+        f = f.strip()
+        if not f or f in cols:
+            continue
+        if f not in allowed:
+            unknown.append(f)
+            continue
+        cols.append(f)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bilinmeyen alan(lar): {', '.join(unknown)}. Geçerli alanlar: {', '.join(allowed)}",
+        )
+    return cols
+
+
+def select_clause(cols: Optional[List[str]]) -> str:
+    """Supabase `select()` için kolon listesini üretir."""
+    return ",".join(cols) if cols else "*"
+
+
+def project(rows: Iterable[Dict[str, Any]], cols: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Sorguya itilemeyen (ör. YouTube'dan gelen) satırlarda alan seçimini uygular."""
+    if not cols:
+        return list(rows)
+    return [{c: row.get(c) for c in cols} for row in rows]
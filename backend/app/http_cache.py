@@ -0,0 +1,155 @@
+# backend/app/http_cache.py
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+# Herkese açık (kullanıcıdan bağımsız) yanıtlar CDN'de kısa süre tutulabilir
+PUBLIC_CACHE = "public, max-age=30, stale-while-revalidate=60"
+# Kullanıcıya özel yanıtlar her seferinde doğrulanmalı
+PRIVATE_CACHE = "private, no-cache"
+
+# Herkese açık URL'ler için hesaplanan doğrulayıcılar bu süre boyunca hatırlanır;
+# bu sürede gelen koşullu istekler Supabase'e gitmeden 304 alır. Hafıza süreç
+# içidir ve başka worker'ların yazmalarını görmez; bu yüzden sadece zaten
+# max-age ile bu kadar bayat sunulabilen PUBLIC_CACHE yanıtları için kullanılır.
+VALIDATOR_TTL_SECONDS = 15
+VALIDATOR_MAX_ENTRIES = 10_000
+_ID_FIELDS = ("id", "video_id", "session_id")
+
+
+def _row_version(row: Dict[str, Any]) -> Optional[Tuple[Any, Any]]:
+    """Satırın kimliği + updated_at alanı varsa ucuz bir (id, version) çifti döner."""
+    # created_at satır güncellenince değişmez; sürüm olarak yalnızca updated_at güvenilir
+    version = row.get("updated_at")
+    ident = next((row.get(f) for f in _ID_FIELDS if row.get(f) is not None), None)
+    if version is None or ident is None:
+        return None
+    return ident, version
+
+
+def compute_etag(rows: Iterable[Dict[str, Any]], *variant: Any) -> str:
+    """
+    Satırlardan zayıf (weak) ETag üretir.
+    Satırlarda id + updated_at varsa sadece bunlar hash'lenir,
+    yoksa satırın tamamı hash'lenir. `variant` ile aynı satırların farklı
+    gösterimleri (örn. alan seçimi) ayrıştırılır.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for v in variant:
+        h.update(repr(v).encode("utf-8"))
+        h.update(b"\x00")
+    for row in rows:
+        ver = _row_version(row)
+        if ver is not None:
+            h.update(f"{ver[0]}|{ver[1]}".encode("utf-8"))
+            # Satır içeriği sürümle birlikte değişir; yine de alan kümesini karıştır
+            h.update(",".join(sorted(row.keys())).encode("utf-8"))
+        else:
+            h.update(json.dumps(row, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\x01")
+    return f'W/"{h.hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Zayıf karşılaştırma: W/ önekini yok say
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        c = candidate.strip()
+        if c.startswith("W/"):
+            c = c[2:]
+        if c == wanted:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Sadece If-None-Match değerlendirilir. Last-Modified üretilmez: satırların en
+    büyük zaman damgası silinen/eklenen eski satırlarla değişmediğinden listeler
+    için güvenilmez, bu yüzden If-Modified-Since da dikkate alınmaz.
+    """
+    inm = request.headers.get("if-none-match")
+    return inm is not None and _etag_matches(inm, etag)
+
+
+def _headers(etag: str, cache_control: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+# ---------------------------
+#   Doğrulayıcı (validator) hafızası
+# ---------------------------
+_validators: Dict[str, Tuple[float, str, str]] = {}
+_validators_lock = threading.Lock()
+
+
+def _cache_key(request: Request) -> str:
+    q = request.url.query
+    return f"{request.url.path}?{q}" if q else request.url.path
+
+
+def precheck(request: Request) -> Optional[Response]:
+    """
+    Aynı (herkese açık) URL için yakın zamanda hesaplanmış doğrulayıcı
+    istemcininkiyle eşleşiyorsa veritabanına hiç gitmeden 304 döner.
+    Kullanıcıya özel (PRIVATE_CACHE) yanıtların doğrulayıcısı hatırlanmaz;
+    onlar her istekte veriyle yeniden doğrulanır.
+    """
+    if "if-none-match" not in request.headers:
+        return None
+    key = _cache_key(request)
+    with _validators_lock:
+        entry = _validators.get(key)
+    if not entry:
+        return None
+    expires, etag, cache_control = entry
+    if expires < time.monotonic():
+        return None
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=_headers(etag, cache_control))
+    return None
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    rows: Iterable[Dict[str, Any]],
+    *variant: Any,
+    cache_control: str = PRIVATE_CACHE,
+) -> Optional[Response]:
+    """
+    ETag'i hesaplar, `response` başlıklarına yazar ve istek koşulu
+    sağlanıyorsa gönderilecek 304 yanıtını döner. Sadece PUBLIC_CACHE
+    yanıtlarının doğrulayıcısı `precheck` için hatırlanır.
+    """
+    rows = list(rows)
+    etag = compute_etag(rows, *variant)
+    headers = _headers(etag, cache_control)
+
+    if cache_control == PUBLIC_CACHE:
+        with _validators_lock:
+            if len(_validators) >= VALIDATOR_MAX_ENTRIES:
+                now = time.monotonic()
+                for key in [k for k, v in _validators.items() if v[0] < now]:
+                    del _validators[key]
+            _validators[_cache_key(request)] = (
+                time.monotonic() + VALIDATOR_TTL_SECONDS, etag, cache_control
+            )
+
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def invalidate(path_prefix: str) -> None:
+    """Yazma işlemlerinden sonra ilgili URL'lerin hafızadaki doğrulayıcılarını siler."""
+    with _validators_lock:
+        for key in [k for k in _validators if k.startswith(path_prefix)]:
+            del _validators[key]
@@ -1,17 +1,38 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from .youtube_service import search_videos, get_new_videos_for_query
-from .supabase_client import supabase
+from .trend_service import get_seo_trends
+from .trend_engine import engine as trend_engine
+from .recommender import recommender
+from .realtime import detector as new_video_detector
+from .watch_sessions import watch_store, load_heatmap
+from . import video_catalog
+from . import video_index
+from .video_catalog import qkey
+from .supabase_client import supabase, execute
+from .resilience import UpstreamUnavailable
+from . import http_cache
+from . import encoding
+from . import profiling
+from . import bulk
+from . import admission
+from .warmup import warmer as cache_warmer
+from .chapters import chapter_pipeline
 
 # 🔌 Routers
 from .routes import topics  # topics router'ını dahil et
+from .routes import recommendations
+from .routes import events
+from .routes import timeline
+from .routes import profiles
+from .routes import chapters
 
-app = FastAPI(title="SEO Eğitim Merkezi API")
+app = FastAPI(title="SEO Eğitim Merkezi API", default_response_class=encoding.FastJSONResponse)
 
 # ---------------------------
 #       CORS Ayarları
@@ -24,65 +45,136 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Büyük liste yanıtları için br/gzip sıkıştırma
+encoding.install_compression(app)
+
 # 🔗 Yönlendiricileri (routers) dahil et
 app.include_router(topics.router)
+app.include_router(recommendations.router)
+app.include_router(events.router)
+app.include_router(timeline.router)
+app.include_router(profiles.router)
+app.include_router(chapters.router)
+
+@app.on_event("startup")
+def _start_background_jobs():
+    """İstek yolundan bağımsız çalışan arka plan işlerini başlatır."""
+    trend_engine.start()
+    recommender.start()
+    new_video_detector.start()
+    watch_store.start()
+    chapter_pipeline.start()
+    cache_warmer.start()
+
+
+@app.on_event("shutdown")
+def _stop_background_jobs():
+    trend_engine.stop()
+    recommender.stop()
+    new_video_detector.stop()
+    watch_store.stop()
+    chapter_pipeline.stop()
+    cache_warmer.stop()
 
-def qkey(s: str) -> str:
-    """Sorgu anahtarını oluşturmak için metni temizle ve küçük harfe dönüştür."""
-    return (s or "").strip().lower()
 
 # ---------------------------
 #       Videolarla İlgili Uç Noktalar
 # ---------------------------
 @app.get("/videos")
 def get_videos(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     query: str,
     language: str = "tr",
     max_results: int = 9,
     order: str = "relevance",
     page_token: Optional[str] = None,
     fresh: bool = False,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    min_duration: Optional[int] = Query(None, ge=0),
+    max_duration: Optional[int] = Query(None, ge=0),
+    published_after: Optional[datetime] = None,
+    published_within_days: Optional[int] = Query(None, ge=1),
 ):
     """
     fresh=True ise: YouTube'dan yeni videoları çeker, cache'e yazar ve döndürür.
     fresh=False ise: Önce YouTube'dan yeni veriyi çeker, cache'e yazar, sonra cache'ten döndürür.
+    fields verilirse (ör. fields=title,thumbnail,duration) sadece bu alanlar döner.
+
+    Cache yolunda dönen nextPageToken bir imleçtir; page_token olarak geri
+    gönderildiğinde sonraki sayfa cache'ten (published_at, video_id) sırasıyla gelir,
+    cache biterse YouTube'un sonraki sayfası eklenir. Sonraki sayfa arka planda hazırlanır.
+
+    sort (newest|oldest|shortest|longest), min_duration/max_duration (saniye),
+    published_after (ISO) veya published_within_days verilirse sonuçlar cache'teki
+    query_key indeksinden filtrelenip sıralanır.
     """
+    cols = encoding.parse_fields(fields)
+    if sort is not None and sort not in video_index.SORTS:
+        raise HTTPException(status_code=400, detail=f"sort şunlardan biri olmalı: {', '.join(video_index.SORTS)}")
+    after_ts = None
+    if published_after is not None:
+        if published_after.tzinfo is None:
+            published_after = published_after.replace(tzinfo=timezone.utc)
+        after_ts = int(published_after.timestamp())
+    if published_within_days is not None:
+        within_ts = int(datetime.now(timezone.utc).timestamp()) - published_within_days * 86400
+        after_ts = max(after_ts or within_ts, within_ts)
+    filtered = sort is not None or min_duration is not None or max_duration is not None or after_ts is not None
+
     if fresh:
-        return search_videos(query, language, max_results, order, page_token, fresh=True)
-
-    # 1) Önce taze veriyi getir ve cache'e yaz
-    fresh_data = search_videos(query, language, max_results, order, page_token, fresh=True)
-    items = fresh_data.get("items", fresh_data.get("results", []))
-    if items:
-        rows = []
-        qk = qkey(query)
-        for it in items:
-            rows.append({
-                "video_id": it["video_id"],
-                "title": it.get("title"),
-                "description": it.get("description"),
-                "thumbnail": it.get("thumbnail"),
-                "published_at": it.get("published_at"),
-                "channel_title": it.get("channel_title"),
-                "channel_id": it.get("channel_id"),
-                "channel_thumbnail": it.get("channel_thumbnail"),
-                "duration": it.get("duration"),
-                "query_key": qk,
-                "query": query,
-                "chapters": it.get("chapters"),
-            })
-        supabase.table("videos").upsert(rows, on_conflict="video_id").execute()
-
-    # 2) Cache'ten çek
-    cached = (
-        supabase.table("videos")
-        .select("*")
-        .eq("query_key", qkey(query))
-        .order("published_at", desc=True)
-        .limit(max_results)
-        .execute()
+        data = search_videos(query, language, max_results, order, page_token, fresh=True)
+        items = encoding.project(data.get("items", []), cols)
+        not_modified = http_cache.conditional(
+            request, response, items, data.get("nextPageToken"),
+            cache_control=http_cache.PUBLIC_CACHE,
+        )
+        return not_modified or encoding.json_response(
+            {"items": items, "nextPageToken": data.get("nextPageToken")}, response
+        )
+
+    # Aynı sayfa az önce doğrulandıysa YouTube'a ve Supabase'e hiç gitme
+    not_modified = http_cache.precheck(request)
+    if not_modified:
+        return not_modified
+
+    if filtered and (page_token is None or video_index.is_cursor(page_token)):
+        # Süre/tarih filtresi veya sıralama: indeks üzerinden, fazla veri çekmeden
+        try:
+            page = video_catalog.filtered_page(
+                query, page_token, max_results, cols, language,
+                sort=sort or "newest",
+                min_duration=min_duration,
+                max_duration=max_duration,
+                published_after=after_ts,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif video_catalog.is_cursor(page_token):
+        # Sonraki sayfalar: cache üzerinde keyset sayfalama
+        try:
+            page = video_catalog.fetch_page(query, page_token, max_results, cols, language)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        # 1) Taze veriyi getir ve cache'e yaz (yakın zamanda tazelendiyse atlanır)
+        refreshed = video_catalog.refresh_first_page(query, language, max_results, order)
+
+        # 2) Cache'ten çek (ilk sayfa yeni yazıldıysa bellekteki sayfaya bakılmaz)
+        page = video_catalog.fetch_page(
+            query, None, max_results, cols, language, allow_fetch=False, use_cache=not refreshed
+        )
+
+    if video_catalog.is_cursor(page["nextPageToken"]):
+        background_tasks.add_task(
+            video_catalog.prefetch, query, page["nextPageToken"], max_results, cols, language
+        )
+    not_modified = http_cache.conditional(
+        request, response, page["items"], page["nextPageToken"], cache_control=http_cache.PUBLIC_CACHE
     )
-    return {"items": cached.data, "nextPageToken": None}
+    return not_modified or encoding.json_response(page, response)
 
 
 @app.get("/new_videos")
@@ -90,6 +182,14 @@ def get_new_videos(query: str, last_checked_at: str):
     """Son kontrol tarihinden sonra eklenen yeni videoları getirir."""
     return {"items": get_new_videos_for_query(query, last_checked_at)}
 
+# ---------------------------
+#       SEO Trendleri
+# ---------------------------
+@app.get("/trends")
+def trends():
+    """Arka planda hesaplanan anahtar kelime trendlerini döner."""
+    return {"trends": get_seo_trends()}
+
 # ---------------------------
 #   Kullanıcı Sorgusu Kontrolü
 # ---------------------------
@@ -97,13 +197,13 @@ def get_new_videos(query: str, last_checked_at: str):
 def get_last_check(user_id: str = Query(...), query: str = Query(...)):
     """Bir kullanıcının belirli bir sorguyu en son ne zaman kontrol ettiğini getirir."""
     try:
-        r = (
+        r = execute(
             supabase.table("user_query_checks")
             .select("last_checked_at")
             .eq("user_id", user_id)
             .eq("query_key", qkey(query))
-            .single()
-            .execute()
+            .single(),
+            idempotent=True,
         )
         return {"last_checked_at": (r.data or {}).get("last_checked_at")}
     except Exception:
@@ -112,16 +212,19 @@ def get_last_check(user_id: str = Query(...), query: str = Query(...)):
 @app.post("/query-check/set")
 def set_last_check(user_id: str = Query(...), query: str = Query(...)):
     """Bir kullanıcının belirli bir sorgu için son kontrol zamanını günceller."""
-    try:
-        payload = {
-            "user_id": user_id,
-            "query_key": qkey(query),
-            "last_checked_at": datetime.now(timezone.utc).isoformat(),
-        }
-        supabase.table("user_query_checks").upsert(payload, on_conflict="user_id,query_key").execute()
-        return {"ok": True, "last_checked_at": payload["last_checked_at"]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with admission.admit("query_check", user_id, upstream="supabase"):
+        try:
+            payload = {
+                "user_id": user_id,
+                "query_key": qkey(query),
+                "last_checked_at": datetime.now(timezone.utc).isoformat(),
+            }
+            execute(supabase.table("user_query_checks").upsert(payload, on_conflict="user_id,query_key"))
+            return {"ok": True, "last_checked_at": payload["last_checked_at"]}
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 # ---------------------------
 #       Favoriler
@@ -129,66 +232,134 @@ def set_last_check(user_id: str = Query(...), query: str = Query(...)):
 @app.get("/favorites")
 def list_favorites(user_id: str):
     """Bir kullanıcının tüm favori videolarını listeler."""
-    data = (
+    data = execute(
         supabase.table("user_favorites")
         .select("*")
-        .eq("user_id", user_id)
-        .execute()
-        .data
-    )
+        .eq("user_id", user_id),
+        idempotent=True,
+    ).data
     return {"items": data}
 
 @app.post("/favorites")
 def add_favorite(user_id: str, video_id: str, query: str = ""):
     """Bir videoyu favorilere ekler."""
-    supabase.table("user_favorites").upsert(
+    execute(supabase.table("user_favorites").upsert(
         {"user_id": user_id, "video_id": video_id, "query": query},
         on_conflict="user_id,video_id",
-    ).execute()
+    ))
     return {"ok": True}
 
 @app.delete("/favorites")
 def remove_favorite(user_id: str, video_id: str):
     """Bir videoyu favorilerden kaldırır."""
-    supabase.table("user_favorites").delete().eq("user_id", user_id).eq("video_id", video_id).execute()
+    execute(supabase.table("user_favorites").delete().eq("user_id", user_id).eq("video_id", video_id))
     return {"ok": True}
 
+class FavoriteItem(BaseModel):
+    video_id: str
+    query: str = ""
+
+class BulkFavoritesAdd(BaseModel):
+    user_id: str
+    items: List[FavoriteItem]
+
+class BulkFavoritesRemove(BaseModel):
+    user_id: str
+    video_ids: List[str]
+
+@app.post("/favorites/bulk")
+def add_favorites_bulk(payload: BulkFavoritesAdd):
+    """
+    Birden çok videoyu tek istekte favorilere ekler (tek upsert).
+    Her öğe için sonuç döner: added | invalid | duplicate | failed.
+    """
+    queries = {}
+    for it in payload.items:
+        queries.setdefault((it.video_id or "").strip(), it.query)
+    video_ids, results = bulk.validate([it.video_id for it in payload.items], bulk.video_id)
+    try:
+        saved = []
+        if video_ids:
+            saved = execute(supabase.table("user_favorites").upsert(
+                [{"user_id": payload.user_id, "video_id": vid, "query": queries.get(vid, "")} for vid in video_ids],
+                on_conflict="user_id,video_id",
+            )).data or []
+        return bulk.finish(results, (r["video_id"] for r in saved), ok="added", missing="failed")
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/favorites/bulk/remove")
+def remove_favorites_bulk(payload: BulkFavoritesRemove):
+    """
+    Birden çok videoyu tek istekte favorilerden kaldırır (tek `in_` silme).
+    Her öğe için sonuç döner: removed | not_found | invalid | duplicate.
+    """
+    video_ids, results = bulk.validate(payload.video_ids, bulk.video_id)
+    try:
+        deleted = []
+        if video_ids:
+            deleted = execute(
+                supabase.table("user_favorites")
+                .delete()
+                .eq("user_id", payload.user_id)
+                .in_("video_id", video_ids)
+            ).data or []
+        return bulk.finish(results, (r["video_id"] for r in deleted), ok="removed", missing="not_found")
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/favorites/detail")
-def favorites_detail(user_id: str):
-    """Kullanıcının favori videolarının detaylarını getirir."""
-    favs = (
+def favorites_detail(request: Request, response: Response, user_id: str, fields: Optional[str] = None):
+    """Kullanıcının favori videolarının detaylarını getirir. fields ile alan seçimi yapılabilir."""
+    cols = encoding.parse_fields(fields)
+    favs = execute(
         supabase.table("user_favorites")
         .select("video_id")
-        .eq("user_id", user_id)
-        .execute()
-        .data
-    )
+        .eq("user_id", user_id),
+        idempotent=True,
+    ).data
     ids = [f["video_id"] for f in favs]
     if not ids:
-        return {"items": []}
+        not_modified = http_cache.conditional(request, response, [])
+        return not_modified or {"items": []}
 
-    vids = (
+    vids = execute(
         supabase.table("videos")
-        .select("*")
-        .in_("video_id", ids)
-        .execute()
-        .data
-    )
+        .select(encoding.select_clause(cols))
+        .in_("video_id", ids),
+        idempotent=True,
+    ).data
 
     order_map = {vid: i for i, vid in enumerate(ids)}
     vids.sort(key=lambda x: order_map.get(x["video_id"], 10**9))
 
-    return {"items": vids}
+    not_modified = http_cache.conditional(request, response, vids)
+    return not_modified or encoding.json_response({"items": vids}, response)
 
 # ---------------------------
 #       Kaynaklar
 # ---------------------------
 @app.get("/video/resources/{video_id}")
-def get_video_resources(video_id: str):
+def get_video_resources(request: Request, response: Response, video_id: str):
     """Bir videoyla ilişkili kaynakları getirir."""
+    not_modified = http_cache.precheck(request)
+    if not_modified:
+        return not_modified
     try:
-        response = supabase.table("video_resources").select("*").eq("video_id", video_id).order("start_seconds").execute()
-        return {"resources": response.data}
+        res = execute(
+            supabase.table("video_resources").select("*").eq("video_id", video_id).order("start_seconds"),
+            idempotent=True,
+        )
+        not_modified = http_cache.conditional(
+            request, response, res.data, cache_control=http_cache.PUBLIC_CACHE
+        )
+        return not_modified or {"resources": res.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -212,54 +383,68 @@ class VideoSessionEnd(BaseModel):
 def start_video_session(session_data: VideoSessionStart):
     """Bir video izleme oturumunu başlatır."""
     try:
-        response = supabase.table("video_sessions").insert({
+        response = execute(supabase.table("video_sessions").insert({
             "user_id": session_data.user_id,
             "video_id": session_data.video_id,
             "query": session_data.query,
-        }).execute()
+        }))
         session_id = response.data[0]["id"] if response.data else None
+        if session_id:
+            watch_store.start_session(session_id, session_data.video_id)
         return {"session_id": session_id}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/video/ping")
-def ping_video_session(ping_data: VideoPing):
-    """Bir video izleme oturumunda ping olayı kaydeder."""
-    try:
-        supabase.table("video_pings").insert(
-            {"session_id": ping_data.session_id, "t_seconds": ping_data.t_seconds, "event": ping_data.event}
-        ).execute()
-        supabase.table("video_sessions").update({
-            "last_ping_time": datetime.now(timezone.utc).isoformat(),
-            "last_t_seconds": ping_data.t_seconds,
-        }).eq("id", ping_data.session_id).execute()
-        return {"status": "ok"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def ping_video_session(ping_data: VideoPing, request: Request):
+    """
+    Bir video izleme oturumunda ping olayı kaydeder.
+    Ping'ler bellekte oturum başına 10 sn'lik kovalara katlanır; Supabase'e
+    her ping'de değil, oturum bitince tek seferde yazılır.
+    """
+    # Ping'ler (oturumun ilk doğrulaması dışında) Supabase'e gitmez; sadece hız sınırı uygulanır.
+    # IP kovası önce bakılır: session_id değiştirmek oturum kovasını atlatır, IP'yi değil.
+    with admission.admit("ping_ip", admission.client_ip(request)), admission.admit("ping", ping_data.session_id):
+        state = watch_store.record(ping_data.session_id, ping_data.t_seconds)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Oturum bulunamadı.")
+    return {"status": "ok", "last_t_seconds": state.last_position}
 
 @app.post("/video/session/end")
 def end_video_session(end_data: VideoSessionEnd):
-    """Bir video izleme oturumunu sonlandırır."""
+    """Bir video izleme oturumunu sonlandırır ve sıkıştırılmış izleme verisini yazar."""
     try:
-        supabase.table("video_sessions").update({
-            "ended_at": datetime.now(timezone.utc).isoformat(),
-        }).eq("id", end_data.session_id).execute()
+        state = watch_store.pop(end_data.session_id)
+        if state is not None:
+            watch_store.persist(state)
+        else:
+            execute(supabase.table("video_sessions").update({
+                "ended_at": datetime.now(timezone.utc).isoformat(),
+            }).eq("id", end_data.session_id))
+        http_cache.invalidate("/video/heatmap")
         return {"status": "ok"}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/video/heatmap")
-def video_heatmap(video_id: str):
-    """Bir video için izleme yoğunluğu (heatmap) verilerini getirir."""
-    data = (
-        supabase.table("video_heatmap")
-        .select("*")
-        .eq("video_id", video_id)
-        .order("bucket_10s", desc=False)
-        .execute()
-        .data
+def video_heatmap(request: Request, response: Response, video_id: str):
+    """
+    Bir video için izleme yoğunluğu (heatmap) verilerini getirir.
+    Sıkıştırılmış oturumlar (video_sessions.watched_buckets) ile eski
+    ping tabanlı video_ping_heatmap görünümü birleştirilir.
+    """
+    not_modified = http_cache.precheck(request)
+    if not_modified:
+        return not_modified
+    data = load_heatmap(video_id)
+    not_modified = http_cache.conditional(
+        request, response, data, cache_control=http_cache.PUBLIC_CACHE
     )
-    return {"items": data}
+    return not_modified or {"items": data}
 
 # ---------------------------
 #    Vurgular (Highlights)
@@ -272,22 +457,30 @@ class Highlight(BaseModel):
 @app.post("/video/highlights")
 def add_video_highlight(highlight_data: Highlight):
     """Bir videoya vurgu ekler."""
-    try:
-        response = supabase.table("video_highlights").insert({
-            "session_id": highlight_data.session_id,
-            "t_seconds": highlight_data.t_seconds,
-            "highlight_text": highlight_data.highlight_text,
-        }).execute()
-        return {"highlight": response.data[0]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with admission.admit("highlights", highlight_data.session_id, upstream="supabase"):
+        try:
+            response = execute(supabase.table("video_highlights").insert({
+                "session_id": highlight_data.session_id,
+                "t_seconds": highlight_data.t_seconds,
+                "highlight_text": highlight_data.highlight_text,
+            }))
+            return {"highlight": response.data[0]}
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/video/highlights/{session_id}")
 def get_video_highlights(session_id: str):
     """Bir oturuma ait vurguları getirir."""
     try:
-        response = supabase.table("video_highlights").select("*").eq("session_id", session_id).order("t_seconds").execute()
+        response = execute(
+            supabase.table("video_highlights").select("*").eq("session_id", session_id).order("t_seconds"),
+            idempotent=True,
+        )
         return {"highlights": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -304,33 +497,48 @@ class VideoNote(BaseModel):
 @app.post("/video/notes")
 def add_video_note(note: VideoNote):
     """Bir videoya not ekler."""
-    try:
-        res = supabase.table("video_notes").insert({
-            "user_id": note.user_id,
-            "video_id": note.video_id,
-            "video_title": note.video_title,
-            "timestamp_seconds": note.timestamp_seconds,
-            "note_text": note.note_text.strip(),
-        }).execute()
-        return {"note": res.data[0]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with admission.admit("notes", note.user_id, upstream="supabase"):
+        try:
+            res = execute(supabase.table("video_notes").insert({
+                "user_id": note.user_id,
+                "video_id": note.video_id,
+                "video_title": note.video_title,
+                "timestamp_seconds": note.timestamp_seconds,
+                "note_text": note.note_text.strip(),
+            }))
+            return {"note": res.data[0]}
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/video/notes/{video_id}")
-def get_notes_for_video(user_id: str, video_id: str):
+def get_notes_for_video(request: Request, response: Response, user_id: str, video_id: str):
     """Bir kullanıcıya ait belirli bir videonun notlarını getirir."""
     try:
-        res = supabase.table("video_notes").select("*").eq("user_id", user_id).eq("video_id", video_id).order("created_at", desc=True).execute()
-        return {"notes": res.data}
+        res = execute(
+            supabase.table("video_notes").select("*").eq("user_id", user_id).eq("video_id", video_id).order("created_at", desc=True),
+            idempotent=True,
+        )
+        not_modified = http_cache.conditional(request, response, res.data)
+        return not_modified or {"notes": res.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/video/notes-all")
-def get_all_notes(user_id: str):
+def get_all_notes(request: Request, response: Response, user_id: str):
     """Bir kullanıcıya ait tüm notları getirir."""
     try:
-        res = supabase.table("video_notes").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return {"notes": res.data}
+        res = execute(
+            supabase.table("video_notes").select("*").eq("user_id", user_id).order("created_at", desc=True),
+            idempotent=True,
+        )
+        not_modified = http_cache.conditional(request, response, res.data)
+        return not_modified or {"notes": res.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -341,3 +549,18 @@ def get_all_notes(user_id: str):
 def health():
     """Uygulamanın çalışıp çalışmadığını kontrol eder."""
     return {"ok": True}
+
+@app.get("/ready")
+def ready(response: Response):
+    """
+    Hazırlık kontrolü: başlangıç cache ısıtması bitene (veya süresi dolana)
+    kadar 503 döner; yük dengeleyici trafiği bundan sonra yönlendirmelidir.
+    """
+    status = cache_warmer.status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+# İstek profilleme (admin başlığı veya PROFILE_SAMPLE_RATE ile açılır).
+# Tüm endpoint'ler tanımlandıktan sonra kurulmalı.
+profiling.install(app)
@@ -0,0 +1,265 @@
+# backend/app/profiling.py
+import asyncio
+import contextvars
+import functools
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+# Admin başlığı: X-Profile: 1 + X-Admin-Token: <PROFILE_ADMIN_TOKEN>
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+# İsteklerin bu oranı (0..1) rastgele profillenir; 0 ise sadece admin başlığıyla
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0)
+# Örnekleme aralığı (saniye)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+# Saklanan son profil sayısı
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+# Bir yığının en fazla derinliği
+MAX_STACK_DEPTH = 128
+
+# Olay döngüsü boşta beklerken alınan örnekler profile yazılmaz
+_IDLE_LEAVES = {"select", "poll", "epoll", "_run_once", "wait"}
+
+Frame = Tuple[str, str, int]  # (fonksiyon, dosya, satır)
+
+
+class Capture:
+    """Tek bir isteğin profili: route, süre ve yığın örnek sayıları."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = next(self._ids)
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms: float = 0.0
+        self.samples: Counter = Counter()
+        self.threads: Set[int] = set()
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+        }
+
+    # ---------------------------
+    #   Dışa aktarma
+    # ---------------------------
+    def folded(self) -> str:
+        """flamegraph.pl / inferno için 'a;b;c sayı' biçimi."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = ";".join(f"{fn} ({os.path.basename(file)}:{line})" for fn, file, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """https://www.speedscope.app dosya biçimi (sampled profil)."""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        interval_ms = PROFILE_INTERVAL * 1000
+        for stack, count in self.samples.items():
+            idx = []
+            for fr in stack:
+                if fr not in frame_index:
+                    frame_index[fr] = len(frames)
+                    frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+                idx.append(frame_index[fr])
+            samples.append(idx)
+            weights.append(count * interval_ms)
+        name = f"{self.method} {self.route or self.path} ({self.duration_ms:.0f} ms)"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "egitim-merkezi-profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+_current: contextvars.ContextVar[Optional[Capture]] = contextvars.ContextVar("profile_capture", default=None)
+
+
+# ---------------------------
+#   Örnekleyici (sampler) thread
+# ---------------------------
+class _Sampler:
+    """Aktif profil varken çalışan tek bir arka plan thread'i; yoksa uyur."""
+
+    def __init__(self) -> None:
+        self._active: Set[Capture] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, cap: Capture) -> None:
+        with self._lock:
+            self._active.add(cap)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, cap: Capture) -> None:
+        with self._lock:
+            self._active.discard(cap)
+
+    @staticmethod
+    def _stack(frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                self._wake.clear()
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for cap in active:
+                for tid in list(cap.threads):
+                    frame = frames.get(tid)
+                    if frame is None or tid == me:
+                        continue
+                    stack = self._stack(frame)
+                    if stack and stack[-1][0] in _IDLE_LEAVES:
+                        continue
+                    cap.samples[stack] += 1
+            del frames
+            time.sleep(PROFILE_INTERVAL)
+
+
+_sampler = _Sampler()
+_captures: Deque[Capture] = deque(maxlen=PROFILE_KEEP)
+_captures_lock = threading.Lock()
+
+
+def slowest(limit: int = 20) -> List[Capture]:
+    with _captures_lock:
+        caps = list(_captures)
+    return sorted(caps, key=lambda c: c.duration_ms, reverse=True)[:limit]
+
+
+def get_capture(capture_id: int) -> Optional[Capture]:
+    with _captures_lock:
+        return next((c for c in _captures if c.id == capture_id), None)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and token == PROFILE_ADMIN_TOKEN
+
+
+# ---------------------------
+#   ASGI middleware
+# ---------------------------
+class ProfilingMiddleware:
+    """
+    İstek admin başlığı taşıyorsa veya örnekleme oranına denk gelirse profillenir.
+    Kapalıyken maliyet bir başlık kontrolü + bir rastgele sayıdır.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    def _wanted(self, scope: Dict[str, Any]) -> bool:
+        if PROFILE_ADMIN_TOKEN:
+            headers = dict(scope.get("headers") or [])
+            if headers.get(b"x-profile") == b"1" and is_admin(headers.get(b"x-admin-token", b"").decode()):
+                return True
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        cap = Capture(scope.get("method", ""), scope.get("path", ""))
+        # Olay döngüsü thread'i de örneklenir (doğrulama, serileştirme vb.)
+        cap.threads.add(threading.get_ident())
+        token = _current.set(cap)
+        _sampler.add(cap)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                cap.status = message.get("status")
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", str(cap.id).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _sampler.remove(cap)
+            _current.reset(token)
+            cap.finish()
+            route = scope.get("route")
+            cap.route = getattr(route, "path", None)
+            with _captures_lock:
+                _captures.append(cap)
+
+
+def _track_thread(fn: Callable) -> Callable:
+    """Senkron endpoint'i çalıştıran thread'i aktif profile kaydeder (profil yoksa doğrudan çağırır)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        cap = _current.get()
+        if cap is None:
+            return fn(*args, **kwargs)
+        tid = threading.get_ident()
+        cap.threads.add(tid)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            cap.threads.discard(tid)
+    return wrapper
+
+
+def install(app: FastAPI) -> None:
+    """
+    Middleware'i ekler ve senkron endpoint'leri thread takibiyle sarar
+    (async endpoint'ler olay döngüsü thread'inde çalışır, o zaten kayıtlı).
+    Tüm router'lar eklendikten sonra çağrılmalıdır.
+    """
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = _track_thread(route.dependant.call)
+    app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,255 @@
+# backend/app/realtime.py
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .supabase_client import supabase, execute
+from .youtube_service import LIST_COST, SEARCH_COST, get_new_videos_for_channel, get_new_videos_for_query
+
+# Bağlantı başına bekleyen en fazla olay; dolarsa bağlantı kapatılır ve
+# istemci Last-Event-ID ile kaldığı yerden devam eder.
+QUEUE_SIZE = 100
+# Last-Event-ID ile yeniden oynatılabilecek son olay sayısı
+HISTORY_SIZE = 2000
+# Dedektörün uyanma aralığı; her hedef kendi aralığı dolunca kontrol edilir (saniye)
+POLL_SECONDS = 60
+# Konu kontrolü search.list (100 birim), kanal kontrolü playlistItems.list (1 birim)
+TOPIC_POLL_SECONDS = 2 * 3600
+CHANNEL_POLL_SECONDS = 10 * 60
+# Dedektörün günlük YouTube kota bütçesi; /videos aramaları için kota bırakılır
+DETECTOR_DAILY_QUOTA = int(os.getenv("DETECTOR_DAILY_QUOTA", "2000"))
+# Aynı anda en fazla bu kadar YouTube isteği (kota koruması)
+POLL_CONCURRENCY = 4
+# Abonelikler bu kadar kullanıcılık parçalarla okunur (in_ filtresi URL'e yazıldığı için sınırlı)
+SUBSCRIPTION_CHUNK = 100
+# Supabase tek istekte en fazla bu kadar satır döndürür
+PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any]
+    audience: FrozenSet[str]
+
+    def encode(self) -> str:
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    user_id: str
+    queue: "asyncio.Queue[Optional[Event]]" = field(default_factory=lambda: asyncio.Queue(QUEUE_SIZE))
+    # Kuyruk taşarsa True olur; akış kapatılır
+    overflowed: bool = False
+
+
+class EventBroker:
+    """
+    Kullanıcı bazlı SSE aboneliklerini tutar. Tek bir tespit, o konuyu takip eden
+    tüm bağlı istemcilere dağıtılır. Sadece olay döngüsü (event loop) içinden çağrılır.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._next_id = 1
+
+    def subscribe(self, user_id: str) -> Subscription:
+        sub = Subscription(user_id)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.user_id]
+
+    def connected_users(self) -> List[str]:
+        return list(self._subscribers)
+
+    def publish(self, user_ids: Iterable[str], event_type: str, data: Dict[str, Any]) -> Optional[Event]:
+        audience = frozenset(user_ids)
+        if not audience:
+            return None
+        event = Event(self._next_id, event_type, data, audience)
+        self._next_id += 1
+        self._history.append(event)
+        for uid in audience:
+            for sub in self._subscribers.get(uid, ()):
+                self._deliver(sub, event)
+        return event
+
+    @staticmethod
+    def _deliver(sub: Subscription, event: Event) -> None:
+        if sub.overflowed:
+            return
+        try:
+            sub.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Yavaş istemci: kuyruğu boşalt, kapatma işareti bırak
+            sub.overflowed = True
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(None)
+
+    def replay(self, user_id: str, last_event_id: int) -> Tuple[List[Event], bool]:
+        """
+        last_event_id'den sonraki olayları döner. İkinci değer, geçmiş tamponu
+        bu aralığı artık kapsamıyorsa True'dur (istemci tam yenileme yapmalı).
+        """
+        if not self._history:
+            return [], False
+        gap = last_event_id < self._history[0].id - 1
+        events = [e for e in self._history if e.id > last_event_id and user_id in e.audience]
+        return events, gap
+
+
+broker = EventBroker()
+
+
+class QuotaBudget:
+    """
+    UTC günü başına birim bütçesi. Harcama gün içine yayılır: günün geçen
+    kısmı kadar bütçe (+ %10 tampon) kullanılabilir, böylece bütçe sabah bitmez.
+    """
+
+    def __init__(self, daily_units: int) -> None:
+        self.daily_units = daily_units
+        self._day: Optional[int] = None
+        self._spent = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self, units: int) -> bool:
+        now = time.time()
+        day, elapsed = divmod(now, 86400)
+        with self._lock:
+            if day != self._day:
+                self._day, self._spent = day, 0
+            allowance = self.daily_units * min(1.0, elapsed / 86400 + 0.1)
+            if self._spent + units > allowance:
+                return False
+            self._spent += units
+            return True
+
+
+class NewVideoDetector:
+    """
+    Bağlı kullanıcıların takip ettiği konu ve kanallar için periyodik olarak
+    YouTube'u kontrol eder ve yeni videoları broker üzerinden yayınlar.
+    Her konu, kaç kullanıcı takip ederse etsin tek bir kez sorgulanır.
+    """
+
+    def __init__(self, broker: EventBroker, interval: float = POLL_SECONDS) -> None:
+        self.broker = broker
+        self.interval = interval
+        # ("topic"|"channel", değer) -> son görülen yayın zamanı (ISO)
+        self._last_seen: Dict[Tuple[str, str], str] = {}
+        # Hedef -> bir sonraki kontrol zamanı (monotonic)
+        self._next_check: Dict[Tuple[str, str], float] = {}
+        self.quota = QuotaBudget(DETECTOR_DAILY_QUOTA)
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _read(table: str, cols: str, user_ids: List[str]) -> List[Dict[str, Any]]:
+        """`user_ids`'in satırlarını SUBSCRIPTION_CHUNK'lık in_ sorgularıyla, sayfa sayfa okur."""
+        rows: List[Dict[str, Any]] = []
+        for i in range(0, len(user_ids), SUBSCRIPTION_CHUNK):
+            chunk = user_ids[i:i + SUBSCRIPTION_CHUNK]
+            start = 0
+            while True:
+                q = supabase.table(table).select(cols).in_("user_id", chunk)
+                for col in cols.split(","):
+                    q = q.order(col)  # sayfalar arası kayma olmasın diye tam sıralama
+                page = execute(q.range(start, start + PAGE_SIZE - 1), idempotent=True).data or []
+                rows.extend(page)
+                if len(page) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+        return rows
+
+    def _load_subscriptions(self, user_ids: Iterable[str]) -> Dict[Tuple[str, str], Set[str]]:
+        # Sıralı parçalar: bağlı kullanıcılar az değiştiğinde aynı sorgular tekrar eder
+        # (devre açıkken son başarılı yanıtları kullanılabilir)
+        user_ids = sorted(user_ids)
+        targets: Dict[Tuple[str, str], Set[str]] = {}
+        for row in self._read("user_topics", "user_id,topic", user_ids):
+            topic = (row.get("topic") or "").strip()
+            if topic:
+                targets.setdefault(("topic", topic.lower()), set()).add(row["user_id"])
+        for row in self._read("channel_subscriptions", "user_id,channel_id", user_ids):
+            if row.get("channel_id"):
+                targets.setdefault(("channel", row["channel_id"]), set()).add(row["user_id"])
+        return targets
+
+    async def _check(self, target: Tuple[str, str], users: Set[str], sem: asyncio.Semaphore) -> None:
+        kind, value = target
+        now = time.monotonic()
+        if self._next_check.get(target, 0.0) > now:
+            return
+        since = self._last_seen.get(target)
+        if since is None:
+            # İlk görüşte geçmişi yayınlama; bundan sonrasını izle
+            self._last_seen[target] = datetime.now(timezone.utc).isoformat()
+            self._next_check[target] = now + (TOPIC_POLL_SECONDS if kind == "topic" else CHANNEL_POLL_SECONDS)
+            return
+        if kind == "topic":
+            fetch, cost, interval = get_new_videos_for_query, SEARCH_COST, TOPIC_POLL_SECONDS
+        else:
+            fetch, cost, interval = get_new_videos_for_channel, LIST_COST, CHANNEL_POLL_SECONDS
+        if not self.quota.try_spend(cost):
+            return  # bütçe dolu: hedef vadesi geçmiş kalır, sonraki turda yeniden denenir
+        self._next_check[target] = now + interval
+        async with sem:
+            videos = await run_in_threadpool(fetch, value, since)
+        if not videos:
+            return
+        self._last_seen[target] = max(v["published_at"] for v in videos)
+        self.broker.publish(users, "new_videos", {kind: value, "items": videos})
+
+    async def poll_once(self) -> None:
+        users = self.broker.connected_users()
+        if not users:
+            return
+        targets = await run_in_threadpool(self._load_subscriptions, users)
+        sem = asyncio.Semaphore(POLL_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self._check(t, u, sem) for t, u in targets.items()), return_exceptions=True
+        )
+        for r in results:
+            if isinstance(r, Exception):
+                print(f"Yeni video kontrolünde hata oluştu: {r}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Yeni video kontrolünde hata oluştu: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Çalışan olay döngüsüne arka plan görevini ekler (startup içinden çağrılır)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+detector = NewVideoDetector(broker)
@@ -0,0 +1,206 @@
+# backend/app/recommender.py
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .supabase_client import supabase
+
+# Her video için saklanan en benzer video sayısı
+TOP_K = 20
+# Arka plan yenileme aralığı (saniye)
+REFRESH_SECONDS = 10 * 60
+# Değişen videolar kataloğun bu oranını aşarsa tam yeniden hesaplama yapılır
+FULL_REBUILD_RATIO = 0.2
+# Supabase tek istekte en fazla bu kadar satır döndürür
+PAGE_SIZE = 1000
+
+# Etkileşim kaynakları ve ağırlıkları: (tablo, ağırlık)
+SOURCES = (
+    ("user_favorites", 3.0),
+    ("video_notes", 2.0),
+    ("video_sessions", 1.0),
+)
+
+
+class Recommender:
+    """
+    Kullanıcı × video etkileşim matrisinden (favori, not, izleme oturumu)
+    video-video kosinüs benzerliği hesaplar.
+
+    Sonuç, her video için TOP_K komşunun tutulduğu iki yoğun dizi olarak saklanır:
+    `_neighbors[i]` (int32 indeksler) ve `_scores[i]` (float32 skorlar).
+    İstek anında arama O(K)'dır.
+    """
+
+    def __init__(self, top_k: int = TOP_K) -> None:
+        self.top_k = top_k
+        # Okuyucuların gördüğü dizilerin değiş-tokuşunu korur
+        self._lock = threading.Lock()
+        # Aynı anda tek bir yenileme çalışsın
+        self._refresh_lock = threading.Lock()
+        # Etkileşimler: (user_idx, item_idx) -> ağırlık; sadece büyüyen kayıt
+        self._interactions: Dict[Tuple[int, int], float] = {}
+        self._user_index: Dict[str, int] = {}
+        self._item_index: Dict[str, int] = {}
+        self._item_ids: List[str] = []
+        # Kaynak tablo -> son okunan created_at (artımlı okuma için)
+        self._watermarks: Dict[str, Optional[str]] = {t: None for t, _ in SOURCES}
+        # Son hesaplamadan beri etkileşimi değişen videolar
+        self._dirty: Set[int] = set()
+        self._neighbors = np.zeros((0, top_k), dtype=np.int32)
+        self._scores = np.zeros((0, top_k), dtype=np.float32)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------------
+    #   Etkileşimleri artımlı okuma
+    # ---------------------------
+    def _fetch_new(self, table: str) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        since = self._watermarks[table]
+        while True:
+            q = supabase.table(table).select("user_id,video_id,created_at")
+            if since:
+                # gte: aynı zaman damgasıyla sonradan yazılan satırlar kaçmasın; tekrar okunan
+                # satırlar _ingest'te elenir (aynı çift için ağırlık artmıyorsa değişiklik yok)
+                q = q.gte("created_at", since)
+            # Tam sıralama: aynı created_at'li satırlar sayfalar arasında kaymasın
+            q = q.order("created_at").order("user_id").order("video_id")
+            page = q.range(start, start + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+        if rows:
+            self._watermarks[table] = rows[-1].get("created_at") or since
+        return rows
+
+    def _ingest(self, rows: List[Dict[str, Any]], weight: float) -> None:
+        for row in rows:
+            uid, vid = row.get("user_id"), row.get("video_id")
+            if not uid or not vid:
+                continue
+            u = self._user_index.setdefault(uid, len(self._user_index))
+            i = self._item_index.get(vid)
+            if i is None:
+                i = self._item_index[vid] = len(self._item_ids)
+                self._item_ids.append(vid)
+            key = (u, i)
+            # Aynı kullanıcı-video çifti için en güçlü sinyal geçerli olsun
+            if weight > self._interactions.get(key, 0.0):
+                self._interactions[key] = weight
+                self._dirty.add(i)
+
+    # ---------------------------
+    #   Benzerlik hesaplama
+    # ---------------------------
+    def _normalized_matrix(self) -> sparse.csc_matrix:
+        """Sütunları (videoları) L2 normuna bölünmüş kullanıcı × video matrisi."""
+        n_users, n_items = len(self._user_index), len(self._item_ids)
+        if not self._interactions:
+            return sparse.csc_matrix((n_users, n_items), dtype=np.float32)
+        keys = np.fromiter((k for pair in self._interactions for k in pair), dtype=np.int32)
+        rows, cols = keys[0::2], keys[1::2]
+        data = np.fromiter(self._interactions.values(), dtype=np.float32, count=len(self._interactions))
+        m = sparse.csc_matrix((data, (rows, cols)), shape=(n_users, n_items))
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=0)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csc_matrix(m.multiply(1.0 / norms[np.newaxis, :]))
+
+    def _top_k_rows(self, sim: sparse.csr_matrix, items: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Seyrek benzerlik satırlarından her satır için en iyi K komşuyu seçer."""
+        k = self.top_k
+        neighbors = np.full((len(items), k), -1, dtype=np.int32)
+        scores = np.zeros((len(items), k), dtype=np.float32)
+        for r, item in enumerate(items):
+            start, end = sim.indptr[r], sim.indptr[r + 1]
+            idx, val = sim.indices[start:end], sim.data[start:end]
+            keep = idx != item  # kendisiyle benzerliği atla
+            idx, val = idx[keep], val[keep]
+            if len(val) > k:
+                part = np.argpartition(-val, k)[:k]
+                idx, val = idx[part], val[part]
+            order = np.argsort(-val)
+            neighbors[r, : len(order)] = idx[order]
+            scores[r, : len(order)] = val[order]
+        return neighbors, scores
+
+    def _recompute(self) -> None:
+        n_items = len(self._item_ids)
+        dirty = np.fromiter(self._dirty, dtype=np.int32, count=len(self._dirty))
+        self._dirty = set()
+        if n_items == 0:
+            return
+        m = self._normalized_matrix()
+
+        neighbors = np.full((n_items, self.top_k), -1, dtype=np.int32)
+        scores = np.zeros((n_items, self.top_k), dtype=np.float32)
+        old = self._neighbors.shape[0]
+        neighbors[:old], scores[:old] = self._neighbors, self._scores
+
+        if old == 0 or len(dirty) > FULL_REBUILD_RATIO * n_items:
+            affected = np.arange(n_items, dtype=np.int32)
+        else:
+            # Bir çiftin kosinüsü sadece iki videodan biri değiştiyse değişir:
+            # değişen videolar + onlarla ortak kullanıcısı olan videolar yeniden hesaplanır.
+            users = np.unique(m[:, dirty].indices)
+            co_items = np.unique(m.tocsr()[users].indices) if len(users) else np.zeros(0, dtype=np.int32)
+            affected = np.union1d(dirty, co_items).astype(np.int32)
+
+        sim = (m[:, affected].T @ m).tocsr()
+        neighbors[affected], scores[affected] = self._top_k_rows(sim, affected)
+        with self._lock:
+            self._neighbors, self._scores = neighbors, scores
+
+    def refresh(self) -> None:
+        """Yeni etkileşimleri okur ve sadece etkilenen videoların komşularını günceller."""
+        # Hesaplama kilit dışında yapılır; okuyucular sadece son dizi değişiminde bekler
+        with self._refresh_lock:
+            for table, weight in SOURCES:
+                self._ingest(self._fetch_new(table), weight)
+            if self._dirty:
+                self._recompute()
+
+    # ---------------------------
+    #   Sorgulama
+    # ---------------------------
+    def related(self, video_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Bir videoya en benzer videoları skorlarıyla döner."""
+        with self._lock:
+            neighbors, scores = self._neighbors, self._scores
+        i = self._item_index.get(video_id)
+        if i is None or i >= neighbors.shape[0]:
+            return []
+        idx, val = neighbors[i, :limit], scores[i, :limit]
+        return [
+            {"video_id": self._item_ids[j], "score": round(float(s), 4)}
+            for j, s in zip(idx, val)
+            if j >= 0 and s > 0
+        ]
+
+    # ---------------------------
+    #   Arka plan yenileme
+    # ---------------------------
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Öneri matrisi güncellenirken hata oluştu: {e}")
+            self._stop.wait(interval)
+
+    def start(self, interval: float = REFRESH_SECONDS) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="recommender", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+recommender = Recommender()
@@ -0,0 +1,189 @@
+# backend/app/resilience.py
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import HTTPException
+
+from .ttl_cache import TTLCache
+
+# Devre açıldıktan sonra yeniden deneme (half-open) için beklenen süre
+RESET_TIMEOUT_SECONDS = 30.0
+# Art arda bu kadar hata devreyi açar
+FAILURE_THRESHOLD = 5
+# Upstream çöktüğünde en fazla bu kadar eski veriyle hizmet verilir (saniye)
+STALE_TTL_SECONDS = 60 * 60
+
+# Aynı anda çalışabilecek en fazla hedge'li çağrı; dolu ise çağrı hedge'siz yapılır
+HEDGE_MAX_CONCURRENCY = 8
+
+
+class UpstreamUnavailable(HTTPException):
+    """Upstream (YouTube / Supabase) devresi açık veya süre aşıldı."""
+
+    def __init__(self, upstream: str, retry_after: float = RESET_TIMEOUT_SECONDS) -> None:
+        super().__init__(
+            status_code=503,
+            detail=f"{upstream} şu anda yanıt vermiyor, lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(int(retry_after))},
+        )
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    """
+    Basit devre kesici: art arda FAILURE_THRESHOLD hatadan sonra açılır,
+    RESET_TIMEOUT_SECONDS boyunca çağrıları hemen reddeder (veya son başarılı
+    yanıtı döner), sonra tek bir deneme çağrısına izin verir.
+
+    `is_failure` sadece upstream'in bozulduğunu gösteren hataları (zaman aşımı,
+    bağlantı hatası, 5xx) saymak için kullanılır; geçersiz istek gibi hatalar
+    devreyi etkilemeden olduğu gibi fırlatılır.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT_SECONDS,
+    ) -> None:
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        # Son başarılı yanıtlar; devre açıkken buradan hizmet verilir
+        self._last_good = TTLCache(ttl=STALE_TTL_SECONDS, maxsize=2048)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probe_in_flight:
+                return False
+            # half-open: tek bir deneme çağrısı
+            self._probe_in_flight = True
+            return True
+
+    def _record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"[circuit] {self.name} devresi açıldı ({self._failures} ardışık hata)")
+                self._opened_at = time.monotonic()
+
+    def _retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return self.reset_timeout
+            return max(1.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def call(self, fn: Callable[[], Any], cache_key: Optional[Hashable] = None) -> Any:
+        """
+        `fn()`'i devre kesici arkasında çalıştırır. cache_key verilirse başarılı
+        sonuç saklanır ve devre açıkken / çağrı başarısızken bu sonuç döner.
+        """
+        if not self._allow():
+            return self._fallback(cache_key)
+        try:
+            result = fn()
+        except Exception as e:
+            if not self.is_failure(e):
+                self._record_success()
+                raise
+            self._record_failure()
+            try:
+                return self._fallback(cache_key)
+            except UpstreamUnavailable as unavailable:
+                raise unavailable from e
+        self._record_success()
+        if cache_key is not None:
+            self._last_good.set(cache_key, result)
+        return result
+
+    def _fallback(self, cache_key: Optional[Hashable]) -> Any:
+        if cache_key is not None:
+            stale = self._last_good.get_stale(cache_key, _MISSING)
+            if stale is not _MISSING:
+                return stale
+        raise UpstreamUnavailable(self.name, self._retry_after())
+
+
+_hedge_slots = threading.BoundedSemaphore(HEDGE_MAX_CONCURRENCY)
+# Her hedge'li çağrı en fazla iki thread kullanır; yuva alındıysa iş kuyrukta beklemez
+_hedge_pool = ThreadPoolExecutor(max_workers=2 * HEDGE_MAX_CONCURRENCY, thread_name_prefix="hedge")
+
+
+def hedged(fn: Callable[[], Any], delay: float, deadline: float) -> Any:
+    """
+    İdempotent okumalar için: ilk deneme `delay` saniyede bitmezse ikinci
+    deneme başlatılır ve ilk *başarıyla* biten denemenin sonucu döner; geride
+    kalanın sonucu yok sayılır. Toplam bekleme `deadline` ile sınırlıdır.
+    Boş hedge yuvası yoksa `fn()` doğrudan çağıran thread'de çalışır; böylece
+    yük altında ek istek atılmaz ve kendi kuyruğumuzdaki bekleme upstream
+    hatası sayılmaz.
+    """
+    if not _hedge_slots.acquire(blocking=False):
+        return fn()
+    started = time.monotonic()
+    lock = threading.Lock()
+    running = [1]
+
+    def attempt() -> Any:
+        try:
+            return fn()
+        finally:
+            with lock:
+                running[0] -= 1
+                last = running[0] == 0
+            if last:
+                _hedge_slots.release()
+
+    futures = [_hedge_pool.submit(attempt)]
+    done, _ = wait(futures, timeout=delay)
+    if not done:
+        with lock:
+            # İlk deneme bu arada bittiyse yuva bırakılmıştır; hedge başlatılmaz
+            hedge = running[0] > 0
+            if hedge:
+                running[0] += 1
+        if hedge:
+            futures.append(_hedge_pool.submit(attempt))
+
+    first_error: Optional[BaseException] = None
+    pending = set(futures)
+    while pending:
+        remaining = deadline - (time.monotonic() - started)
+        done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+        if not done:
+            raise TimeoutError(f"{len(futures)} deneme {deadline} sn içinde bitmedi")
+        for future in (f for f in futures if f in done):
+            if future.exception() is None:
+                return future.result()
+            first_error = first_error or future.exception()
+    raise first_error
+
+
+_MISSING = object()
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from ..chapters import chapter_pipeline
+from ..resilience import UpstreamUnavailable
+from ..supabase_client import supabase, execute
+
+router = APIRouter(prefix="/chapters", tags=["chapters"])
+
+
+@router.get("/search")
+def search_chapters(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=100),
+    detail: bool = False,
+):
+    """
+    Tüm videolardaki bölüm başlıklarında arar ("X konusunun anlatıldığı bölüme atla").
+    Arama bellekteki indekste yapılır; hiçbir açıklama yeniden ayrıştırılmaz.
+    detail=True ise video başlığı/küçük resmi de eklenir (tek bir `in_` sorgusu).
+    """
+    hits = chapter_pipeline.index.search(q, limit)
+    if not detail or not hits:
+        return {"items": hits}
+
+    try:
+        ids = sorted({h["video_id"] for h in hits})
+        rows = execute(
+            supabase.table("videos").select("video_id,title,thumbnail,channel_title").in_("video_id", ids),
+            idempotent=True,
+        ).data or []
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    by_id = {row["video_id"]: row for row in rows}
+    items = [{**h, "video": by_id.get(h["video_id"])} for h in hits]
+    return {"items": items}
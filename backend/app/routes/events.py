@@ -0,0 +1,73 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..realtime import broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Proxy'lerin boşta bağlantıyı kesmemesi için yorum satırı gönderme aralığı (saniye)
+KEEPALIVE_SECONDS = 20
+# Bağlantı koparsa tarayıcının yeniden deneme gecikmesi (ms)
+RETRY_MS = 5000
+
+
+def _parse_event_id(value: Optional[str]) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    user_id: str = Query(...),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Kullanıcının takip ettiği konu/kanallarda yeni video çıktığında
+    `new_videos` olaylarını Server-Sent Events olarak iter.
+    Yeniden bağlanırken Last-Event-ID başlığı ile kaçırılan olaylar tekrar gönderilir.
+    """
+    sub = broker.subscribe(user_id)
+    last_sent = _parse_event_id(last_event_id or request.query_params.get("last_event_id"))
+
+    async def stream():
+        nonlocal last_sent
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if last_sent:
+                missed, gap = broker.replay(user_id, last_sent)
+                if gap:
+                    # Geçmiş tampon yetmedi; istemci listeyi baştan çekmeli
+                    yield "event: resync\ndata: {}\n\n"
+                for event in missed:
+                    last_sent = event.id
+                    yield event.encode()
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Kuyruk taştı: bağlantıyı kapat, istemci Last-Event-ID ile devam eder
+                    break
+                if event.id <= last_sent:
+                    continue  # replay ile zaten gönderildi
+                last_sent = event.id
+                yield event.encode()
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,54 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from .. import profiling
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not profiling.is_admin(token):
+        raise HTTPException(status_code=403, detail="Yetkisiz.")
+
+
+def _capture_or_404(capture_id: int) -> profiling.Capture:
+    cap = profiling.get_capture(capture_id)
+    if cap is None:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı.")
+    return cap
+
+
+@router.get("")
+def list_profiles(
+    limit: int = Query(20, ge=1, le=200),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """Son profillenen istekleri en yavaştan hızlıya listeler."""
+    _require_admin(x_admin_token)
+    return {"items": [c.summary() for c in profiling.slowest(limit)]}
+
+
+@router.get("/{capture_id}/speedscope")
+def download_speedscope(capture_id: int, x_admin_token: Optional[str] = Header(None)):
+    """Profili https://www.speedscope.app ile açılabilecek JSON dosyası olarak indirir."""
+    _require_admin(x_admin_token)
+    cap = _capture_or_404(capture_id)
+    return Response(
+        json.dumps(cap.speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="profile-{cap.id}.speedscope.json"'},
+    )
+
+
+@router.get("/{capture_id}/folded")
+def download_folded(capture_id: int, x_admin_token: Optional[str] = Header(None)):
+    """Profili flamegraph.pl / inferno için katlanmış (folded) yığın biçiminde indirir."""
+    _require_admin(x_admin_token)
+    cap = _capture_or_404(capture_id)
+    return PlainTextResponse(
+        cap.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{cap.id}.folded"'},
+    )
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from ..recommender import recommender
+from ..resilience import UpstreamUnavailable
+from ..supabase_client import supabase, execute
+
+router = APIRouter(prefix="/video", tags=["recommendations"])
+
+
+@router.get("/related/{video_id}")
+def related_videos(
+    video_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    detail: bool = True,
+):
+    """
+    Birlikte favorilenen / izlenen / not alınan videolara göre benzer videoları döner.
+    Benzerlikler arka planda önceden hesaplanır; burada sadece O(K) arama yapılır.
+    detail=True ise video satırları da eklenir (tek bir `in_` sorgusu).
+    """
+    related = recommender.related(video_id, limit)
+    if not detail or not related:
+        return {"items": related}
+
+    try:
+        ids = [r["video_id"] for r in related]
+        rows = execute(supabase.table("videos").select("*").in_("video_id", ids), idempotent=True).data or []
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    by_id = {row["video_id"]: row for row in rows}
+    items = [{**by_id[r["video_id"]], "score": r["score"]} for r in related if r["video_id"] in by_id]
+    return {"items": items}
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from ..chapters import chapter_pipeline
+from ..resilience import UpstreamUnavailable
+from ..supabase_client import supabase, execute
+from ..ttl_cache import TTLCache
+from ..watch_sessions import load_heatmap
+
+router = APIRouter(prefix="/video", tags=["timeline"])
+
+# Kullanıcıdan bağımsız parçalar (kaynaklar, bölümler, heatmap) video başına bu süre saklanır
+SHARED_TTL_SECONDS = 120
+
+_shared_cache = TTLCache(ttl=SHARED_TTL_SECONDS, maxsize=2048)
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="timeline")
+
+
+def _load_resources(video_id: str) -> List[Dict[str, Any]]:
+    return execute(
+        supabase.table("video_resources").select("*").eq("video_id", video_id).order("start_seconds"),
+        idempotent=True,
+    ).data or []
+
+
+def _load_chapters(video_id: str) -> List[Dict[str, Any]]:
+    indexed = chapter_pipeline.index.for_video(video_id)
+    if indexed is not None:
+        return indexed
+    rows = execute(
+        supabase.table("videos").select("chapters").eq("video_id", video_id).limit(1),
+        idempotent=True,
+    ).data or []
+    return (rows[0].get("chapters") or []) if rows else []
+
+
+def _load_notes(video_id: str, user_id: str) -> List[Dict[str, Any]]:
+    return execute(
+        supabase.table("video_notes").select("*").eq("user_id", user_id).eq("video_id", video_id),
+        idempotent=True,
+    ).data or []
+
+
+def _load_highlights(session_id: str) -> List[Dict[str, Any]]:
+    return execute(
+        supabase.table("video_highlights").select("*").eq("session_id", session_id),
+        idempotent=True,
+    ).data or []
+
+
+def _shared(kind: str, video_id: str, loader: Callable[[str], Any]) -> Any:
+    return _shared_cache.get_or_set((kind, video_id), lambda: loader(video_id))
+
+
+def prime(rows: List[Dict[str, Any]]) -> None:
+    """
+    Verilen `videos` satırları için bölüm ve kaynak önbelleğini doldurur
+    (başlangıç ısıtması). Kaynaklar tek bir in_ sorgusuyla çekilir.
+    """
+    ids = [r["video_id"] for r in rows if r.get("video_id")]
+    if not ids:
+        return
+    for r in rows:
+        if "chapters" in r:
+            _shared_cache.set(("chapters", r["video_id"]), r.get("chapters") or [])
+    resources = execute(
+        supabase.table("video_resources").select("*").in_("video_id", ids).order("start_seconds"),
+        idempotent=True,
+    ).data or []
+    grouped: Dict[str, List[Dict[str, Any]]] = {vid: [] for vid in ids}
+    for row in resources:
+        grouped.setdefault(row["video_id"], []).append(row)
+    for vid, items in grouped.items():
+        _shared_cache.set(("resources", vid), items)
+
+
+def _entries(kind: str, rows: List[Dict[str, Any]], time_field: str) -> List[Dict[str, Any]]:
+    return [{**row, "type": kind, "start_seconds": int(row.get(time_field) or 0)} for row in rows]
+
+
+@router.get("/timeline/{video_id}")
+def video_timeline(video_id: str, user_id: Optional[str] = None, session_id: Optional[str] = None):
+    """
+    Oynatıcı sayfası için tek çağrı: kaynaklar, bölümler, notlar ve vurgular
+    start_seconds'a göre sıralı tek bir zaman çizelgesinde, heatmap ise ayrı alanda döner.
+    Kaynaklar sunucuda paralel çekilir; kullanıcıdan bağımsız parçalar video başına önbelleklenir.
+    """
+    try:
+        futures = {
+            "resources": _pool.submit(_shared, "resources", video_id, _load_resources),
+            "chapters": _pool.submit(_shared, "chapters", video_id, _load_chapters),
+            "heatmap": _pool.submit(_shared, "heatmap", video_id, load_heatmap),
+        }
+        if user_id:
+            futures["notes"] = _pool.submit(_load_notes, video_id, user_id)
+        if session_id:
+            futures["highlights"] = _pool.submit(_load_highlights, session_id)
+        parts = {name: f.result() for name, f in futures.items()}
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    timeline = (
+        _entries("chapter", parts["chapters"], "start_seconds")
+        + _entries("resource", parts["resources"], "start_seconds")
+        + _entries("note", parts.get("notes", []), "timestamp_seconds")
+        + _entries("highlight", parts.get("highlights", []), "t_seconds")
+    )
+    timeline.sort(key=lambda e: e["start_seconds"])
+    return {"video_id": video_id, "timeline": timeline, "heatmap": parts["heatmap"]}
@@ -1,9 +1,11 @@
-from typing import Optional, Set
+from typing import List, Optional, Set
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from ..supabase_client import supabase
+from .. import bulk
+from ..resilience import UpstreamUnavailable
+from ..supabase_client import supabase, execute
 
 router = APIRouter(prefix="/subscribe", tags=["topics"])
 
@@ -14,6 +16,12 @@ class TopicSubscribe(BaseModel):
     channel_id: Optional[str] = None
 
 
+class TopicSubscribeBulk(BaseModel):
+    user_id: str
+    topics: List[str]
+    channel_id: Optional[str] = None
+
+
 @router.get("/topics")
 def list_topics(user_id: str = Query(...), channel_id: Optional[str] = None):
     """
@@ -27,7 +35,7 @@ def list_topics(user_id: str = Query(...), channel_id: Optional[str] = None):
             # NULL kanal veya eşleşen channel_id
             q = q.or_(f"channel_id.is.null,channel_id.eq.{channel_id}")
 
-        resp = q.order("created_at", desc=True).execute()
+        resp = execute(q.order("created_at", desc=True), idempotent=True)
         data = resp.data or []
 
         topics: Set[str] = {
@@ -36,6 +44,8 @@ def list_topics(user_id: str = Query(...), channel_id: Optional[str] = None):
             if row.get("topic")
         }
         return {"topics": sorted(topics)}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -46,15 +56,17 @@ def subscribe_topic(payload: TopicSubscribe):
     Konu ekle (idempotent). Aynı (user_id, topic) varsa günceller/atlar.
     """
     try:
-        supabase.table("user_topics").upsert(
+        execute(supabase.table("user_topics").upsert(
             {
                 "user_id": payload.user_id,
                 "channel_id": payload.channel_id,
                 "topic": payload.topic.strip(),
             },
             on_conflict="user_id,topic",  # Unique index şart
-        ).execute()
+        ))
         return {"ok": True}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -75,7 +87,56 @@ def unsubscribe_topic(payload: TopicSubscribe):
         if payload.channel_id:
             q = q.eq("channel_id", payload.channel_id)
 
-        q.execute()
+        execute(q)
         return {"ok": True}
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/topics/bulk")
+def subscribe_topics_bulk(payload: TopicSubscribeBulk):
+    """
+    Birden çok konuyu tek istekte ekler (tek upsert). Onboarding / liste içe aktarma için.
+    Her konu için sonuç döner: subscribed | invalid | duplicate | failed.
+    """
+    topics, results = bulk.validate(payload.topics)
+    try:
+        saved = []
+        if topics:
+            saved = execute(supabase.table("user_topics").upsert(
+                [{"user_id": payload.user_id, "channel_id": payload.channel_id, "topic": t} for t in topics],
+                on_conflict="user_id,topic",
+            )).data or []
+        return bulk.finish(results, (r.get("topic") for r in saved), ok="subscribed", missing="failed")
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/topics/bulk/unsubscribe")
+def unsubscribe_topics_bulk(payload: TopicSubscribeBulk):
+    """
+    Birden çok konu takibini tek `in_` silmesiyle bırakır.
+    Her konu için sonuç döner: unsubscribed | not_found | invalid | duplicate.
+    """
+    topics, results = bulk.validate(payload.topics)
+    try:
+        deleted = []
+        if topics:
+            q = (
+                supabase.table("user_topics")
+                .delete()
+                .eq("user_id", payload.user_id)
+                .in_("topic", topics)
+            )
+            if payload.channel_id:
+                q = q.eq("channel_id", payload.channel_id)
+            deleted = execute(q).data or []
+        return bulk.finish(results, (r.get("topic") for r in deleted), ok="unsubscribed", missing="not_found")
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 # backend/app/routes/video_notes.py
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List
+from backend.app import http_cache
 from backend.app.models.video_notes import NoteCreate, NoteOut
 from backend.app.repositories.video_notes_repo import (
     insert_note, get_notes_by_video, get_all_notes, delete_note,
@@ -23,19 +24,23 @@ def add_video_note(payload: NoteCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("", response_model=List[NoteOut])
-def list_all_notes(client_id: str = Query(..., min_length=1)):
+def list_all_notes(request: Request, response: Response, client_id: str = Query(..., min_length=1)):
     try:
-        return get_all_notes(client_id)
+        rows = get_all_notes(client_id)
+        return http_cache.conditional(request, response, rows) or rows
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/by-video", response_model=List[NoteOut])
 def list_notes_by_video(
+    request: Request,
+    response: Response,
     client_id: str = Query(..., min_length=1),
     video_id: str = Query(..., min_length=1),
 ):
     try:
-        return get_notes_by_video(client_id, video_id)
+        rows = get_notes_by_video(client_id, video_id)
+        return http_cache.conditional(request, response, rows) or rows
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
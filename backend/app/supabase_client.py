@@ -1,9 +1,20 @@
 # backend/app/supabase_client.py
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Hashable, Optional
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import ClientOptions, Client, create_client
+
+from .resilience import CircuitBreaker, hedged
+
+# Tek bir PostgREST çağrısı için üst sınır (saniye)
+SUPABASE_TIMEOUT = 5
+# Hedge opsiyoneldir: yavaşlayan bir upstream'e ek okuma yükü bindirir
+SUPABASE_HEDGE = os.getenv("SUPABASE_HEDGE", "0") == "1"
+# Açıksa: hedge edilen okumalarda toplam süre ve ikinci denemeden önceki bekleme
+SUPABASE_READ_DEADLINE = 6.0
+SUPABASE_HEDGE_DELAY = 0.5
 
 def _load_env():
     """
@@ -58,5 +69,38 @@ if not supabase_url or not supabase_key:
         "  VITE_SUPABASE_URL + VITE_SUPABASE_ANON_KEY\n"
     )
 
-# Supabase istemcisi
-supabase: Client = create_client(supabase_url, supabase_key)
+# Supabase istemcisi (her çağrı SUPABASE_TIMEOUT ile sınırlı; zaman aşımı
+# supabase 2.x'te istemciye verilen httpx.Client üzerinden ayarlanır)
+supabase: Client = create_client(
+    supabase_url,
+    supabase_key,
+    options=ClientOptions(httpx_client=httpx.Client(timeout=SUPABASE_TIMEOUT, follow_redirects=True)),
+)
+
+
+def _is_supabase_failure(e: BaseException) -> bool:
+    # Sadece ağ/zaman aşımı hataları devreyi açar; geçersiz sorgu vb. açmaz
+    return isinstance(e, (httpx.TransportError, TimeoutError))
+
+
+supabase_breaker = CircuitBreaker("Supabase", is_failure=_is_supabase_failure)
+
+
+def execute(query: Any, cache_key: Optional[Hashable] = None, idempotent: bool = False) -> Any:
+    """
+    Bir Supabase sorgusunu devre kesici arkasında çalıştırır.
+    idempotent=True okumalarda devre açıkken aynı sorgunun son başarılı yanıtı
+    döner (cache_key verilmezse sorgudan türetilir); SUPABASE_HEDGE=1 ise
+    gecikenler hedge edilir.
+    """
+    if idempotent and cache_key is None:
+        # PostgREST isteğinin yolu + parametreleri (offset/limit dahil) okumayı benzersiz tanımlar
+        request = getattr(query, "request", query)
+        path, params = getattr(request, "path", None), getattr(request, "params", None)
+        if path is not None:
+            cache_key = (str(path), str(params))
+    if idempotent and SUPABASE_HEDGE:
+        fn = lambda: hedged(query.execute, delay=SUPABASE_HEDGE_DELAY, deadline=SUPABASE_READ_DEADLINE)
+    else:
+        fn = query.execute
+    return supabase_breaker.call(fn, cache_key=cache_key)
@@ -0,0 +1,223 @@
+# backend/app/trend_engine.py
+import bisect
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+from .supabase_client import supabase
+
+# Karşılaştırılan pencere: son WINDOW_DAYS gün vs. ondan önceki WINDOW_DAYS gün
+WINDOW_DAYS = 7
+HISTORY_DAYS = 2 * WINDOW_DAYS
+# Arka plan yenileme aralığı (saniye)
+REFRESH_SECONDS = 15 * 60
+# Hız (velocity) eşikleri
+RISING_RATIO = 1.25
+FALLING_RATIO = 0.8
+# Bu sayının altındaki hacimler gürültü kabul edilir
+MIN_VOLUME = 3
+# Gösterilecek en fazla trend
+TOP_N = 10
+# Supabase tek istekte en fazla bu kadar satır döndürür
+PAGE_SIZE = 1000
+
+_ALERTS = {
+    "rising": ("YÜKSELİŞTE", "📈", "\"{kw}\" konusunda son {w} günde yayınlanan video sayısı {r}; önceki döneme göre ({p}) hızla artıyor."),
+    "falling": ("DÜŞÜŞTE", "📉", "\"{kw}\" konusundaki yeni içerik azalıyor: son {w} günde {r} video, önceki dönemde {p}."),
+    "stable": ("STABİL", "📊", "\"{kw}\" konusunda içerik üretimi stabil: son {w} günde {r} video, önceki dönemde {p}."),
+}
+
+
+def _parse(ts: Optional[str]) -> Optional[datetime]:
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class TrendEngine:
+    """
+    `videos` kataloğundaki (query_key, published_at) çiftlerinden anahtar kelime
+    hızını hesaplar. Konu başına yayın zamanları sıralı tutulur; her yenilemede
+    sadece `updated_at` filigranından sonra değişen satırlar okunur. Sonuç
+    bellekte tutulur ve istek yolunda hiçbir sorgu yapılmaz.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # query_key -> artan sıralı yayın zamanları (epoch saniye)
+        self._times: Dict[str, List[float]] = {}
+        # video_id -> (query_key, yayın zamanı); aynı videoyu iki kez saymamak için
+        self._seen: Dict[str, Tuple[str, float]] = {}
+        # query_key -> kullanıcıya gösterilecek orijinal sorgu metni
+        self._labels: Dict[str, str] = {}
+        # Okunan en büyük updated_at; sonraki yenilemeler buradan devam eder
+        self._watermark: Optional[datetime] = None
+        self._snapshot: List[Dict[str, Any]] = []
+        self._updated_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------------
+    #   Sayaç bakımı
+    # ---------------------------
+    def _fetch(self, since: datetime) -> List[Dict[str, Any]]:
+        """
+        İlk yenilemede son HISTORY_DAYS günde yayınlananları, sonrakilerde
+        sadece filigrandan sonra yazılmış/güncellenmiş satırları okur.
+        """
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            q = supabase.table("videos").select("video_id,query_key,query,published_at,updated_at")
+            if self._watermark is None:
+                q = q.gte("published_at", since.isoformat()).order("published_at", desc=True)
+            else:
+                # gte: aynı zaman damgasıyla sonradan yazılan satırlar kaçmasın (tekrarlar _seen ile elenir)
+                q = q.gte("updated_at", self._watermark.isoformat()).order("updated_at")
+            page = q.range(start, start + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+        stamps = [d for d in (_parse(r.get("updated_at")) for r in rows) if d is not None]
+        if stamps and (self._watermark is None or max(stamps) > self._watermark):
+            self._watermark = max(stamps)
+        return rows
+
+    def _apply(self, rows: List[Dict[str, Any]], cutoff: float) -> None:
+        """Satırları sayaçlara işler; sadece yeni/değişen videolar sayaçları oynatır."""
+        for row in rows:
+            vid = row.get("video_id")
+            qk = (row.get("query_key") or "").strip()
+            published = _parse(row.get("published_at"))
+            if not vid or not qk or published is None:
+                continue
+            ts = published.timestamp()
+            if ts < cutoff:
+                continue
+            if row.get("query"):
+                self._labels[qk] = row["query"]
+            prev = self._seen.get(vid)
+            if prev == (qk, ts):
+                continue
+            if prev is not None:
+                self._remove(*prev)
+            bisect.insort(self._times.setdefault(qk, []), ts)
+            self._seen[vid] = (qk, ts)
+
+        # Pencereden düşen videoları at
+        for vid in [v for v, (_, t) in self._seen.items() if t < cutoff]:
+            self._remove(*self._seen.pop(vid))
+
+    def _remove(self, qk: str, ts: float) -> None:
+        times = self._times.get(qk)
+        if times is None:
+            return
+        i = bisect.bisect_left(times, ts)
+        if i < len(times) and times[i] == ts:
+            del times[i]
+        if not times:
+            del self._times[qk]
+            self._labels.pop(qk, None)
+
+    # ---------------------------
+    #   Trend hesaplama
+    # ---------------------------
+    def _compute(self, now: datetime) -> List[Dict[str, Any]]:
+        """Son dönem [now-7g, now) ile önceki dönem [now-14g, now-7g) eşit uzunluktadır."""
+        end = now.timestamp()
+        mid = end - WINDOW_DAYS * 86400
+        begin = end - HISTORY_DAYS * 86400
+        trends = []
+        for qk, times in self._times.items():
+            i_begin = bisect.bisect_left(times, begin)
+            i_mid = bisect.bisect_left(times, mid)
+            i_end = bisect.bisect_left(times, end)
+            recent = i_end - i_mid
+            previous = i_mid - i_begin
+            if recent + previous < MIN_VOLUME:
+                continue
+            # +1 yumuşatma: sıfır hacimli dönemde sonsuz oran olmasın
+            velocity = (recent + 1) / (previous + 1)
+            if velocity >= RISING_RATIO:
+                kind = "rising"
+            elif velocity <= FALLING_RATIO:
+                kind = "falling"
+            else:
+                kind = "stable"
+            alert, icon, template = _ALERTS[kind]
+            label = self._labels.get(qk, qk)
+            trends.append({
+                "keyword": label,
+                "alert": alert,
+                "message": template.format(kw=label, w=WINDOW_DAYS, r=recent, p=previous),
+                "link": f"https://www.youtube.com/results?search_query={quote_plus(label)}",
+                "icon": icon,
+                "velocity": round(velocity, 3),
+                "recent_count": recent,
+                "previous_count": previous,
+                "updated_at": now.isoformat(),
+            })
+        # Önce hareket büyüklüğü, sonra hacim
+        trends.sort(key=lambda t: (abs(t["velocity"] - 1), t["recent_count"]), reverse=True)
+        return trends[:TOP_N]
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Kataloğu okuyup sayaçları günceller ve yeni anlık görüntüyü üretir."""
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=HISTORY_DAYS)
+        rows = self._fetch(since)
+        with self._lock:
+            self._apply(rows, since.timestamp())
+            self._snapshot = self._compute(now)
+            self._updated_at = now
+            snapshot = list(self._snapshot)
+
+        # Diğer okuyucular için seo_trends tablosunu da güncel tut (en iyi çaba)
+        if snapshot:
+            try:
+                supabase.table("seo_trends").upsert(
+                    [{k: t[k] for k in ("keyword", "alert", "message", "link", "icon", "updated_at")} for t in snapshot],
+                    on_conflict="keyword",
+                ).execute()
+            except Exception as e:
+                print(f"seo_trends tablosu güncellenirken hata oluştu: {e}")
+        return snapshot
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Son hesaplanan trendleri döner (istek yolunda I/O yok)."""
+        with self._lock:
+            return list(self._snapshot)
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        return self._updated_at
+
+    # ---------------------------
+    #   Arka plan yenileme
+    # ---------------------------
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Trend hesaplanırken hata oluştu: {e}")
+            self._stop.wait(interval)
+
+    def start(self, interval: float = REFRESH_SECONDS) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="trend-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+engine = TrendEngine()
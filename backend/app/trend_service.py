@@ -1,11 +1,11 @@
 # backend/app/trend_service.py
-import requests
-import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta, timezone
 from .supabase_client import supabase
+from .trend_engine import engine
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import List
+from . import bulk
 import uuid
 
 load_dotenv()
@@ -51,6 +51,18 @@ class ChannelSubscriptionPayload(BaseModel):
     user_id: str
     channel_id: str
 
+class TopicSubscriptionItem(BaseModel):
+    channel_id: str
+    keyword: str
+
+class BulkTopicSubscriptionPayload(BaseModel):
+    user_id: str
+    items: List[TopicSubscriptionItem]
+
+class BulkChannelSubscriptionPayload(BaseModel):
+    user_id: str
+    channel_ids: List[str]
+
 @app.post("/share/favorites")
 def share_favorites(payload: SharePayload):
     """
@@ -131,6 +143,65 @@ def unsubscribe_from_topic(user_id: str, channel_id: str, keyword: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Toplu konu aboneliği: (channel_id, keyword) çiftleri
+def _topic_pair(item: TopicSubscriptionItem):
+    channel_id, keyword = bulk.strip_text(item.channel_id), bulk.strip_text(item.keyword)
+    return (channel_id, keyword) if channel_id and keyword else None
+
+def _pair_label(pair):
+    return {"channel_id": pair[0], "keyword": pair[1]}
+
+def _quote(value: str) -> str:
+    # PostgREST or_ filtresi için değer tırnaklanır (virgül/parantez içerebilir)
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+@app.post("/subscribe/topic/bulk")
+def subscribe_to_topics_bulk(payload: BulkTopicSubscriptionPayload):
+    """
+    Birden çok (kanal, anahtar kelime) aboneliğini tek upsert ile ekler; zaten
+    abone olunan çiftler isteği bozmaz. Her öğe için sonuç döner:
+    subscribed | invalid | duplicate | failed.
+    """
+    pairs, results = bulk.validate(payload.items, _topic_pair, _pair_label)
+    supabase_client = supabase
+    try:
+        data = []
+        if pairs:
+            response = supabase_client.table('topic_subscriptions').upsert([
+                {'user_id': payload.user_id, 'channel_id': c, 'keyword': k} for c, k in pairs
+            ], on_conflict='user_id,channel_id,keyword').execute()
+            data = response.data or []
+        done = ((r.get('channel_id'), r.get('keyword')) for r in data)
+        return bulk.finish(results, done, ok="subscribed", missing="failed")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/subscribe/topic/bulk/unsubscribe")
+def unsubscribe_from_topics_bulk(payload: BulkTopicSubscriptionPayload):
+    """
+    Birden çok konu aboneliğini tek silme isteğiyle kaldırır.
+    Her öğe için sonuç döner: unsubscribed | not_found | invalid | duplicate.
+    """
+    pairs, results = bulk.validate(payload.items, _topic_pair, _pair_label)
+    supabase_client = supabase
+    try:
+        data = []
+        if pairs:
+            # Aynı kanalın anahtar kelimeleri tek in_ koşulunda toplanır
+            by_channel = {}
+            for c, k in pairs:
+                by_channel.setdefault(c, []).append(k)
+            clauses = ",".join(
+                f"and(channel_id.eq.{_quote(c)},keyword.in.({','.join(_quote(k) for k in kws)}))"
+                for c, kws in by_channel.items()
+            )
+            response = supabase_client.table('topic_subscriptions').delete().eq('user_id', payload.user_id).or_(clauses).execute()
+            data = response.data or []
+        done = ((r.get('channel_id'), r.get('keyword')) for r in data)
+        return bulk.finish(results, done, ok="unsubscribed", missing="not_found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ✅ YENİ: Kanal aboneliği ekleme ve silme endpoint'leri
 @app.post("/subscribe/channel")
 def subscribe_to_channel(payload: ChannelSubscriptionPayload):
@@ -159,46 +230,48 @@ def unsubscribe_from_channel(user_id: str, channel_id: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-# Mevcut kodlar...
-def get_seo_trends():
+@app.post("/subscribe/channel/bulk")
+def subscribe_to_channels_bulk(payload: BulkChannelSubscriptionPayload):
     """
-    Supabase'den SEO trendlerini çeker. Eğer veri yoksa veya eskiyse (24 saatten fazla),
-    güncelleyip geri döner.
+    Kullanıcıyı birden çok kanala tek upsert ile abone yapar; zaten abone
+    olunan kanallar isteği bozmaz. Her kanal için sonuç döner:
+    subscribed | invalid | duplicate | failed.
     """
+    channel_ids, results = bulk.validate(payload.channel_ids)
+    supabase_client = supabase
     try:
-        response = supabase.table("seo_trends").select("*").execute()
-        trends = response.data
+        data = []
+        if channel_ids:
+            response = supabase_client.table('channel_subscriptions').upsert([
+                {'user_id': payload.user_id, 'channel_id': c} for c in channel_ids
+            ], on_conflict='user_id,channel_id').execute()
+            data = response.data or []
+        return bulk.finish(results, (r.get('channel_id') for r in data), ok="subscribed", missing="failed")
     except Exception as e:
-        print(f"Supabase'den trend verisi çekilirken hata oluştu: {e}")
-        return []
-
-    if not trends or is_data_outdated(trends):
-        print("Trend verisi yok veya güncel değil. Güncelleniyor...")
-        try:
-            supabase.table("seo_trends").upsert(DUMMY_TRENDS_DATA, on_conflict="keyword").execute()
-            response = supabase.table("seo_trends").select("*").execute()
-            trends = response.data
-        except Exception as e:
-            print(f"Supabase'e trend verisi yazılırken hata oluştu: {e}")
-            return []
-
-    return trends
+        raise HTTPException(status_code=400, detail=str(e))
 
-def is_data_outdated(trends):
+@app.post("/subscribe/channel/bulk/unsubscribe")
+def unsubscribe_from_channels_bulk(payload: BulkChannelSubscriptionPayload):
     """
-    Verinin 24 saatten eski olup olmadığını kontrol eder.
+    Kullanıcının birden çok kanal aboneliğini tek in_ silmesiyle kaldırır.
+    Her kanal için sonuç döner: unsubscribed | not_found | invalid | duplicate.
     """
-    if not trends:
-        return True
-    
-    last_updated_str = trends[0].get("updated_at")
-    if not last_updated_str:
-        return True
-    
+    channel_ids, results = bulk.validate(payload.channel_ids)
+    supabase_client = supabase
     try:
-        last_updated = datetime.fromisoformat(last_updated_str).astimezone(timezone.utc)
-        now = datetime.now(timezone.utc)
-        return (now - last_updated) > timedelta(hours=24)
-    except (ValueError, TypeError) as e:
-        print(f"Tarih formatında hata: {e}")
-        return True
\ No newline at end of file
+        data = []
+        if channel_ids:
+            response = supabase_client.table('channel_subscriptions').delete().eq('user_id', payload.user_id).in_('channel_id', channel_ids).execute()
+            data = response.data or []
+        return bulk.finish(results, (r.get('channel_id') for r in data), ok="unsubscribed", missing="not_found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Mevcut kodlar...
+def get_seo_trends():
+    """
+    Arka planda hesaplanan SEO trendlerini döner. İstek yolunda Supabase'e gidilmez;
+    motor henüz ilk hesaplamayı bitirmediyse örnek veriler döner.
+    """
+    trends = engine.snapshot()
+    return trends or DUMMY_TRENDS_DATA
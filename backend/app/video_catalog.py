@@ -0,0 +1,255 @@
+# backend/app/video_catalog.py
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import video_index
+from .resilience import UpstreamUnavailable
+from .supabase_client import supabase, execute
+from .ttl_cache import TTLCache
+from .youtube_service import search_videos
+
+# Cache sayfalama imleçlerinin öneki (YouTube pageToken'larından ayırt etmek için)
+CURSOR_PREFIX = "c1."
+# Bir imleç cache'in sonuna ulaştığında en fazla bu kadar YouTube sayfası eklenir
+MAX_FALLTHROUGH_PAGES = 2
+# Hesaplanan sayfalar bu süre boyunca bellekte tutulur (önceden getirme dahil)
+PAGE_TTL_SECONDS = 120
+# İlk sayfa YouTube'dan en fazla bu sıklıkla tazelenir
+REFRESH_TTL_SECONDS = 300
+
+_pages = TTLCache(ttl=PAGE_TTL_SECONDS, maxsize=2048)
+# (query_key, dil, sıralama) -> son YouTube tazelemesi yapıldı mı
+_refreshed = TTLCache(ttl=REFRESH_TTL_SECONDS, maxsize=4096)
+
+
+def qkey(s: str) -> str:
+    """Sorgu anahtarını oluşturmak için metni temizle ve küçük harfe dönüştür."""
+    return (s or "").strip().lower()
+
+
+# ---------------------------
+#   İmleç (cursor)
+# ---------------------------
+def is_cursor(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith(CURSOR_PREFIX)
+
+
+def encode_cursor(published_at: str, video_id: str) -> str:
+    raw = json.dumps([published_at, video_id], separators=(",", ":")).encode("utf-8")
+    return CURSOR_PREFIX + base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, str]:
+    """(published_at, video_id) döner; bozuk imleçte ValueError fırlatır."""
+    body = token[len(CURSOR_PREFIX):]
+    body += "=" * (-len(body) % 4)
+    try:
+        published_at, video_id = json.loads(base64.urlsafe_b64decode(body))
+    except Exception as e:
+        raise ValueError("Geçersiz sayfa imleci") from e
+    return str(published_at), str(video_id)
+
+
+# ---------------------------
+#   Cache'e yazma
+# ---------------------------
+def cache_items(query: str, items: List[Dict[str, Any]]) -> None:
+    """YouTube sonuçlarını `videos` kataloğuna query_key ile yazar."""
+    if not items:
+        return
+    qk = qkey(query)
+    rows = []
+    for it in items:
+        rows.append({
+            "video_id": it["video_id"],
+            "title": it.get("title"),
+            "description": it.get("description"),
+            "thumbnail": it.get("thumbnail"),
+            "published_at": it.get("published_at"),
+            "channel_title": it.get("channel_title"),
+            "channel_id": it.get("channel_id"),
+            "channel_thumbnail": it.get("channel_thumbnail"),
+            "duration": it.get("duration"),
+            "duration_seconds": it.get("duration_seconds"),
+            "published_ts": it.get("published_ts"),
+            "query_key": qk,
+            "query": query,
+            "chapters": it.get("chapters"),
+        })
+    execute(supabase.table("videos").upsert(rows, on_conflict="video_id"))
+    video_index.invalidate(qk)
+
+
+def refresh_first_page(query: str, language: str, limit: int, order: str = "relevance") -> bool:
+    """
+    İlk sayfayı YouTube'dan tazeleyip kataloğa yazar. Aynı sorgu son
+    REFRESH_TTL_SECONDS içinde tazelendiyse (ör. başlangıç ısıtmasıyla) atlanır.
+    Yeni veri yazıldıysa True döner.
+    """
+    # Sayfa boyu anahtara girmez: farklı max_results ile gelen istekler aynı tazelemeyi paylaşır
+    key = (qkey(query), language, order)
+    if key in _refreshed:
+        return False
+    try:
+        data = search_videos(query, language, limit, order, None, fresh=True)
+    except UpstreamUnavailable:
+        return False  # YouTube erişilemez: mevcut cache ile devam
+    cache_items(query, data.get("items", data.get("results", [])))
+    _refreshed.set(key, True)
+    return True
+
+
+# ---------------------------
+#   Keyset sayfalama
+# ---------------------------
+def _select(cols: Optional[List[str]]) -> str:
+    if not cols:
+        return "*"
+    # İmleç üretmek için sıralama kolonları her zaman gerekli
+    extra = [c for c in ("published_at", "video_id") if c not in cols]
+    return ",".join(list(cols) + extra)
+
+
+def _keyset_query(qk: str, cursor: Optional[Tuple[str, str]], limit: int, cols: Optional[List[str]]):
+    q = supabase.table("videos").select(_select(cols)).eq("query_key", qk)
+    if cursor:
+        p, v = cursor
+        # (published_at, video_id) < (p, v); değerler PostgREST için tırnaklı
+        q = q.or_(f'published_at.lt."{p}",and(published_at.eq."{p}",video_id.lt."{v}")')
+    q = q.order("published_at", desc=True).order("video_id", desc=True).limit(limit + 1)
+    return execute(q, idempotent=True).data or []
+
+
+def _fetch_youtube_page(
+    query: str,
+    language: str,
+    limit: int,
+    published_before: Optional[str],
+    page_token: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    İmlecin devamını YouTube'dan kataloğa ekler: tarih sıralı arama
+    `publishedBefore=<imleç published_at>` ile yapıldığından gelen satırlar
+    her zaman imleçten sonraya düşer. YouTube erişilemezse None döner.
+    """
+    try:
+        data = search_videos(
+            query, language, limit, "date", page_token, fresh=True, published_before=published_before
+        )
+    except UpstreamUnavailable:
+        return None
+    cache_items(query, data.get("items", []))
+    return data
+
+
+def fetch_page(
+    query: str,
+    cursor_token: Optional[str],
+    limit: int,
+    cols: Optional[List[str]] = None,
+    language: str = "tr",
+    allow_fetch: bool = True,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Kataloğu (published_at, video_id) üzerinde keyset ile sayfalar.
+    Cache biterse (allow_fetch=True ise) YouTube'dan imlecin öncesinde yayınlanmış
+    videolar eklenir ve sorgu tekrarlanır. {"items": [...], "nextPageToken": imleç|None} döner.
+    """
+    qk = qkey(query)
+    key = (qk, cursor_token, limit, tuple(cols or ()))
+    if use_cache:
+        cached = _pages.get(key)
+        if cached is not None:
+            return cached
+
+    cursor = decode_cursor(cursor_token) if cursor_token else None
+    rows = _keyset_query(qk, cursor, limit, cols)
+    # YouTube'un bu imleçten sonra başka sonucu olmadığı kesinleşti mi
+    exhausted = False
+    youtube_token: Optional[str] = None
+    pages = 0
+    while len(rows) <= limit and allow_fetch and pages < MAX_FALLTHROUGH_PAGES:
+        pages += 1
+        data = _fetch_youtube_page(query, language, limit, cursor[0] if cursor else None, youtube_token)
+        if data is None:
+            break  # YouTube erişilemez: eldekilerle devam, imleç korunur
+        rows = _keyset_query(qk, cursor, limit, cols)
+        youtube_token = data.get("nextPageToken")
+        if not youtube_token:
+            exhausted = True
+            break
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_token = None
+    if rows and (has_more or not exhausted):
+        last = rows[-1]
+        next_token = encode_cursor(last["published_at"], last["video_id"])
+
+    if cols:
+        rows = [{c: r.get(c) for c in cols} for r in rows]
+    page = {"items": rows, "nextPageToken": next_token}
+    _pages.set(key, page)
+    return page
+
+
+def prefetch(query: str, cursor_token: Optional[str], limit: int, cols: Optional[List[str]], language: str) -> None:
+    """Bir sonraki sayfayı arka planda hazırlar (BackgroundTasks ile çağrılır)."""
+    if not cursor_token:
+        return
+    try:
+        fetch_page(query, cursor_token, limit, cols, language)
+    except Exception as e:
+        print(f"Sonraki sayfa önceden getirilirken hata oluştu: {e}")
+
+
+# ---------------------------
+#   Süre / tarih filtreli sayfalama
+# ---------------------------
+def filtered_page(
+    query: str,
+    cursor_token: Optional[str],
+    limit: int,
+    cols: Optional[List[str]] = None,
+    language: str = "tr",
+    sort: str = "newest",
+    min_duration: Optional[int] = None,
+    max_duration: Optional[int] = None,
+    published_after: Optional[int] = None,
+    published_before: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    query_key indeksi üzerinden filtreler/sıralar, sadece sayfadaki satırları çeker.
+    Katalog boşsa önce YouTube'un ilk sayfası cache'e yazılır.
+    """
+    qk = qkey(query)
+    offset = video_index.decode_cursor(cursor_token)
+    index = video_index.get_index(qk)
+    if not len(index) and not cursor_token:
+        try:
+            cache_items(query, search_videos(query, language, limit, "relevance", None, fresh=True).get("items", []))
+        except UpstreamUnavailable:
+            pass
+        index = video_index.get_index(qk)
+
+    ids, has_more = index.query(
+        min_duration=min_duration,
+        max_duration=max_duration,
+        published_after=published_after,
+        published_before=published_before,
+        sort=sort,
+        offset=offset,
+        limit=limit,
+    )
+    rows: List[Dict[str, Any]] = []
+    if ids:
+        rows = execute(
+            supabase.table("videos").select(",".join(cols) if cols else "*").in_("video_id", ids),
+            idempotent=True,
+        ).data or []
+        position = {vid: i for i, vid in enumerate(ids)}
+        rows.sort(key=lambda r: position.get(r["video_id"], len(ids)))
+    next_token = video_index.encode_cursor(offset + len(ids)) if has_more else None
+    return {"items": rows, "nextPageToken": next_token}
@@ -0,0 +1,139 @@
+# backend/app/video_index.py
+import bisect
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .supabase_client import supabase, execute
+from .ttl_cache import TTLCache
+from .youtube_service import hhmmss_to_seconds, published_epoch
+
+# İndeks sayfalama imleçlerinin öneki
+INDEX_CURSOR_PREFIX = "f1."
+# Bir query_key indeksi bu süre sonra yeniden kurulur (yazmalar ayrıca geçersiz kılar)
+INDEX_TTL_SECONDS = 300
+# Supabase tek istekte en fazla bu kadar satır döndürür
+PAGE_SIZE = 1000
+
+SORTS = ("newest", "oldest", "shortest", "longest")
+
+_indexes = TTLCache(ttl=INDEX_TTL_SECONDS, maxsize=1024)
+
+
+class QueryIndex:
+    """
+    Bir query_key'in videoları için sıralı, dizi tabanlı indeks.
+    `by_date` ve `by_duration` pozisyon dizileri ilgili anahtara göre artan sıralıdır;
+    aralık sorguları bisect ile, diğer koşul tarama ile uygulanır.
+    """
+
+    __slots__ = ("ids", "published", "durations", "by_date", "by_duration", "_date_keys", "_duration_keys")
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.ids: List[str] = []
+        self.published = array("q")
+        self.durations = array("l")
+        for row in rows:
+            ts = row.get("published_ts")
+            if ts is None:
+                ts = published_epoch(row.get("published_at"))
+            dur = row.get("duration_seconds")
+            if dur is None:
+                dur = hhmmss_to_seconds(row.get("duration") or "")
+            self.ids.append(row["video_id"])
+            self.published.append(int(ts or 0))
+            self.durations.append(int(dur or 0))
+
+        n = len(self.ids)
+        # Eşitlikte video_id ile kararlı sıralama (sayfalar arası tutarlılık)
+        self.by_date = array("l", sorted(range(n), key=lambda i: (self.published[i], self.ids[i])))
+        self.by_duration = array("l", sorted(range(n), key=lambda i: (self.durations[i], self.ids[i])))
+        self._date_keys = array("q", (self.published[i] for i in self.by_date))
+        self._duration_keys = array("l", (self.durations[i] for i in self.by_duration))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def query(
+        self,
+        min_duration: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        published_after: Optional[int] = None,
+        published_before: Optional[int] = None,
+        sort: str = "newest",
+        offset: int = 0,
+        limit: int = 10,
+    ) -> Tuple[List[str], bool]:
+        """Koşula uyan video_id'leri sıralı döner; ikinci değer devamı olup olmadığıdır."""
+        if sort in ("shortest", "longest"):
+            order, keys = self.by_duration, self._duration_keys
+            lo_v, hi_v = min_duration, max_duration
+        else:
+            order, keys = self.by_date, self._date_keys
+            lo_v, hi_v = published_after, published_before
+        lo = bisect.bisect_left(keys, lo_v) if lo_v is not None else 0
+        hi = bisect.bisect_right(keys, hi_v) if hi_v is not None else len(keys)
+        positions = range(hi - 1, lo - 1, -1) if sort in ("newest", "longest") else range(lo, hi)
+
+        out: List[str] = []
+        skipped = 0
+        for p in positions:
+            i = order[p]
+            d, ts = self.durations[i], self.published[i]
+            if min_duration is not None and d < min_duration:
+                continue
+            if max_duration is not None and d > max_duration:
+                continue
+            if published_after is not None and ts < published_after:
+                continue
+            if published_before is not None and ts > published_before:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(out) == limit:
+                return out, True
+            out.append(self.ids[i])
+        return out, False
+
+
+def _load(qk: str) -> QueryIndex:
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        page = execute(
+            supabase.table("videos")
+            .select("video_id,duration,duration_seconds,published_at,published_ts")
+            .eq("query_key", qk)
+            .order("video_id")  # sabit sıra: sayfalar çakışmaz / satır atlanmaz
+            .range(start, start + PAGE_SIZE - 1),
+            idempotent=True,
+        ).data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return QueryIndex(rows)
+        start += PAGE_SIZE
+
+
+def get_index(qk: str) -> QueryIndex:
+    return _indexes.get_or_set(qk, lambda: _load(qk))
+
+
+def invalidate(qk: str) -> None:
+    _indexes.delete(qk)
+
+
+def is_cursor(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith(INDEX_CURSOR_PREFIX)
+
+
+def encode_cursor(offset: int) -> str:
+    return f"{INDEX_CURSOR_PREFIX}{offset}"
+
+
+def decode_cursor(token: Optional[str]) -> int:
+    if not token:
+        return 0
+    try:
+        return max(0, int(token[len(INDEX_CURSOR_PREFIX):]))
+    except ValueError as e:
+        raise ValueError("Geçersiz sayfa imleci") from e
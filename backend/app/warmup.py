@@ -0,0 +1,170 @@
+# backend/app/warmup.py
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from . import video_catalog, video_index
+from .routes import timeline
+from .supabase_client import supabase, execute
+from .youtube_service import LIST_COST, SEARCH_COST
+
+# Isıtılacak en popüler konu sayısı
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "20"))
+# Aynı anda ısıtılan konu sayısı (Supabase okumaları)
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "3"))
+# Isıtmanın (sıralama dahil) toplam süre bütçesi; dolunca kalanlar atlanır ve uygulama hazır sayılır
+WARMUP_BUDGET_SECONDS = float(os.getenv("WARMUP_BUDGET_SECONDS", "20"))
+# Worker başına ısıtmada harcanabilecek YouTube kotası (birim). Isıtma kataloğu
+# Supabase'ten okur; YouTube sadece kataloğu boş konular için, bu bütçe içinde çağrılır.
+# Worker'lar arasında koordinasyon yoktur: toplam harcama en fazla worker sayısı x bu değerdir.
+WARMUP_YOUTUBE_UNITS = int(os.getenv("WARMUP_YOUTUBE_UNITS", "303"))
+# Boş bir konunun ilk sayfasını doldurmak: search.list + videos.list
+REFRESH_COST = SEARCH_COST + LIST_COST
+# Sorgu hacmi için bakılan izleme oturumu penceresi
+SESSION_WINDOW_DAYS = 7
+# Bir abone, bu kadar izleme oturumu ağırlığında sayılır
+SUBSCRIBER_WEIGHT = 5
+# Ön yüzün /videos çağrılarıyla aynı olmalı (VideoList, VideoSearch ve
+# EducationCenter max_results=12 gönderir); sayfa cache anahtarı sayfa boyunu içerir
+DEFAULT_LANGUAGE = "tr"
+DEFAULT_PAGE_SIZE = 12
+# Her kaynaktan (yazım başına gruplanmış) en fazla bu kadar satır okunur
+RANK_CANDIDATES = WARMUP_TOP_N * 10
+# Kaynak tablo -> bir satırın (abone/oturum) ağırlığı
+_SOURCE_WEIGHTS = {"user_topics": SUBSCRIBER_WEIGHT, "topic_subscriptions": SUBSCRIBER_WEIGHT, "video_sessions": 1}
+
+
+def rank_topics(limit: int = WARMUP_TOP_N) -> List[str]:
+    """
+    Konuları abone sayısı (user_topics + topic_subscriptions) ve son
+    SESSION_WINDOW_DAYS gündeki izleme oturumu hacmine göre sıralar.
+    Sayım veritabanında yapılır (`warmup_topic_counts`, bkz. migrations/0006);
+    tabloların tamamı indirilmez. Aynı query_key'in en sık görülen yazımı döner.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=SESSION_WINDOW_DAYS)).isoformat()
+    rows = execute(supabase.rpc("warmup_topic_counts", {"since": since, "max_rows": RANK_CANDIDATES})).data or []
+
+    scores: Counter = Counter()
+    spellings: Dict[str, Counter] = {}
+    for row in rows:
+        text = (row.get("topic") or "").strip()
+        qk = video_catalog.qkey(text)
+        if not qk:
+            continue
+        n = int(row.get("n") or 0)
+        scores[qk] += n * _SOURCE_WEIGHTS.get(row.get("source"), 1)
+        spellings.setdefault(qk, Counter())[text] += n
+
+    return [spellings[qk].most_common(1)[0][0] for qk, _ in scores.most_common(limit)]
+
+
+def warm_query(query: str, try_spend: Callable[[int], bool] = lambda units: False) -> None:
+    """
+    Bir konu için /videos ilk sayfasını, filtre indeksini ve video meta verisi
+    önbelleğini Supabase kataloğundan doldurur. Katalog boşsa ve `try_spend`
+    kota verirse ilk sayfa YouTube'dan çekilir.
+    """
+    page = video_catalog.fetch_page(
+        query, None, DEFAULT_PAGE_SIZE, None, DEFAULT_LANGUAGE, allow_fetch=False, use_cache=False
+    )
+    if not page["items"] and try_spend(REFRESH_COST):
+        if video_catalog.refresh_first_page(query, DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE):
+            page = video_catalog.fetch_page(
+                query, None, DEFAULT_PAGE_SIZE, None, DEFAULT_LANGUAGE, allow_fetch=False, use_cache=False
+            )
+    video_index.get_index(video_catalog.qkey(query))
+    timeline.prime(page["items"])
+
+
+class CacheWarmer:
+    """
+    Deploy sonrası soğuk cache'leri popüler konularla, sınırlı eşzamanlılık,
+    süre bütçesi ve YouTube kota bütçesiyle ısıtır. Bitene (veya süre
+    dolana) kadar `/ready` 503 döner.
+    """
+
+    def __init__(self) -> None:
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._units_left = WARMUP_YOUTUBE_UNITS
+        self._report: Dict[str, Any] = {"warmed": [], "failed": [], "skipped": [], "youtube_units": 0}
+
+    def _try_spend(self, units: int) -> bool:
+        with self._lock:
+            if units > self._units_left:
+                return False
+            self._units_left -= units
+            self._report["youtube_units"] += units
+            return True
+
+    def run(self) -> None:
+        started = time.monotonic()
+        deadline = started + WARMUP_BUDGET_SECONDS
+        self._pool = ThreadPoolExecutor(max_workers=max(1, WARMUP_CONCURRENCY), thread_name_prefix="warmup")
+        try:
+            # Sıralama da süre bütçesine dahildir
+            ranking = self._pool.submit(rank_topics)
+            try:
+                topics = ranking.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                print("Isıtılacak konular süre bütçesi içinde alınamadı")
+                topics = []
+            except Exception as e:
+                print(f"Isıtılacak konular alınamadı: {e}")
+                topics = []
+
+            futures = {self._pool.submit(self._warm, t, deadline): t for t in topics}
+            _, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for f in pending:
+                f.cancel()
+                self._note("skipped", futures[f])
+        finally:
+            # Bütçe dolduysa çalışan ısıtmaları bekleme; arka planda bitsinler
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            with self._lock:
+                self._report["seconds"] = round(time.monotonic() - started, 2)
+            self._ready.set()
+
+    def _warm(self, query: str, deadline: float) -> None:
+        if time.monotonic() >= deadline:
+            self._note("skipped", query)
+            return
+        try:
+            warm_query(query, self._try_spend)
+            self._note("warmed", query)
+        except Exception as e:
+            print(f"'{query}' ısıtılırken hata oluştu: {e}")
+            self._note("failed", query)
+
+    def _note(self, kind: str, query: str) -> None:
+        with self._lock:
+            self._report[kind].append(query)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            report = {k: list(v) if isinstance(v, list) else v for k, v in self._report.items()}
+        return {"ready": self._ready.is_set(), **report}
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self.run, name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+warmer = CacheWarmer()
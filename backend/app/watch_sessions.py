@@ -0,0 +1,240 @@
+# backend/app/watch_sessions.py
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from .resilience import UpstreamUnavailable
+from .supabase_client import supabase, execute
+from .ttl_cache import TTLCache
+
+# Heatmap çözünürlüğü (saniye)
+BUCKET_SECONDS = 10
+# Bu kadar süre ping gelmeyen oturumlar kapatılmış sayılıp yazılır
+IDLE_FLUSH_SECONDS = 30 * 60
+# Boşta oturum kontrol aralığı
+SWEEP_SECONDS = 60
+# Makul olmayan konumlara karşı üst sınır (12 saat)
+MAX_T_SECONDS = 12 * 3600
+# Veritabanında bulunamayan oturum kimlikleri bu süre boyunca tekrar sorgulanmaz
+UNKNOWN_SESSION_TTL_SECONDS = 10 * 60
+
+
+def runs_from_bitmap(bitmap: bytearray) -> List[List[int]]:
+    """İzlenen kovaları [[başlangıç, bitiş], ...] (bitiş dahil) aralıklarına çevirir."""
+    runs: List[List[int]] = []
+    start = None
+    n = len(bitmap) * 8
+    for i in range(n + 1):
+        on = i < n and bool(bitmap[i >> 3] & (1 << (i & 7)))
+        if on and start is None:
+            start = i
+        elif not on and start is not None:
+            runs.append([start, i - 1])
+            start = None
+    return runs
+
+
+class WatchState:
+    """Tek bir izleme oturumunun sıkıştırılmış hali: izlenen 10 sn'lik kovalar bit dizisi olarak."""
+
+    __slots__ = ("session_id", "video_id", "bitmap", "last_position", "last_ping", "last_ping_at")
+
+    def __init__(self, session_id: str, video_id: Optional[str] = None) -> None:
+        self.session_id = session_id
+        self.video_id = video_id
+        self.bitmap = bytearray()
+        self.last_position = 0
+        self.last_ping = time.monotonic()
+        self.last_ping_at = datetime.now(timezone.utc)
+
+    def mark(self, t_seconds: int) -> None:
+        t = min(max(0, int(t_seconds)), MAX_T_SECONDS)
+        bucket = t // BUCKET_SECONDS
+        byte = bucket >> 3
+        if byte >= len(self.bitmap):
+            self.bitmap.extend(b"\x00" * (byte + 1 - len(self.bitmap)))
+        self.bitmap[byte] |= 1 << (bucket & 7)
+        self.last_position = t
+        self.last_ping = time.monotonic()
+        self.last_ping_at = datetime.now(timezone.utc)
+
+    def merge_runs(self, runs: List[List[int]]) -> None:
+        """Daha önce yazılmış [[başlangıç, bitiş], ...] aralıklarını bit dizisine ekler."""
+        for start, end in runs or []:
+            for bucket in range(max(0, int(start)), min(int(end), MAX_T_SECONDS // BUCKET_SECONDS) + 1):
+                byte = bucket >> 3
+                if byte >= len(self.bitmap):
+                    self.bitmap.extend(b"\x00" * (byte + 1 - len(self.bitmap)))
+                self.bitmap[byte] |= 1 << (bucket & 7)
+
+    def runs(self) -> List[List[int]]:
+        return runs_from_bitmap(self.bitmap)
+
+    def watched_seconds(self) -> int:
+        return sum(bin(b).count("1") for b in self.bitmap) * BUCKET_SECONDS
+
+
+class WatchSessionStore:
+    """
+    Ping'leri bellekte oturum başına sıkıştırır; Supabase'e sadece oturum
+    bittiğinde (veya uzun süre boşta kaldığında) tek bir güncelleme yazılır.
+    Yazma, kayıtlı aralıklarla veritabanında birleştirilir; bu yüzden aynı
+    oturumun ping'leri farklı worker'lara dağılsa da (yapışkan yönlendirme
+    gerekmez) hiçbir worker diğerinin kovalarını ezmez.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, WatchState] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._unknown = TTLCache(ttl=UNKNOWN_SESSION_TTL_SECONDS, maxsize=100_000)
+
+    def start_session(self, session_id: str, video_id: str) -> None:
+        with self._lock:
+            self._sessions[session_id] = WatchState(session_id, video_id)
+
+    def _resume(self, session_id: str) -> Optional[WatchState]:
+        """Bellekte olmayan oturumu veritabanından doğrular ve kayıtlı aralıklarıyla yükler."""
+        if session_id in self._unknown:
+            return None
+        try:
+            rows = execute(
+                supabase.table("video_sessions")
+                .select("id,video_id,watched_buckets,last_t_seconds")
+                .eq("id", session_id)
+                .limit(1)
+            ).data or []
+        except UpstreamUnavailable:
+            raise
+        except Exception:
+            rows = []  # ör. geçersiz uuid biçimi
+        if not rows:
+            self._unknown.set(session_id, True)
+            return None
+        state = WatchState(session_id, rows[0].get("video_id"))
+        state.merge_runs(rows[0].get("watched_buckets") or [])
+        state.last_position = int(rows[0].get("last_t_seconds") or 0)
+        return state
+
+    def record(self, session_id: str, t_seconds: int) -> Optional[WatchState]:
+        """Ping'i işler; `start_session` ile açılmamış ve veritabanında olmayan oturumlar için None."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+        if state is None:
+            state = self._resume(session_id)
+            if state is None:
+                return None
+        with self._lock:
+            state = self._sessions.setdefault(session_id, state)
+            state.mark(t_seconds)
+            return state
+
+    def pop(self, session_id: str) -> Optional[WatchState]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def persist(self, state: WatchState, ended_at: Optional[datetime] = None) -> None:
+        """Bu sürecin aralıklarını kayıtlı aralıklarla birleştirerek yazar (bkz. migrations/0008)."""
+        execute(supabase.rpc("merge_watch_session", {
+            "p_id": state.session_id,
+            "p_runs": state.runs(),
+            "p_last_t_seconds": state.last_position,
+            "p_last_ping_time": state.last_ping_at.isoformat(),
+            "p_ended_at": (ended_at or datetime.now(timezone.utc)).isoformat(),
+            "p_bucket_seconds": BUCKET_SECONDS,
+        }))
+
+    # ---------------------------
+    #   Boşta kalan oturumlar
+    # ---------------------------
+    def flush_idle(self) -> int:
+        cutoff = time.monotonic() - IDLE_FLUSH_SECONDS
+        with self._lock:
+            idle = [s for s in self._sessions.values() if s.last_ping < cutoff]
+            for s in idle:
+                del self._sessions[s.session_id]
+        for s in idle:
+            try:
+                self.persist(s, ended_at=s.last_ping_at)
+            except Exception as e:
+                print(f"Oturum {s.session_id} yazılırken hata oluştu: {e}")
+        return len(idle)
+
+    def _run(self) -> None:
+        while not self._stop.wait(SWEEP_SECONDS):
+            self.flush_idle()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="watch-sessions", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Kapanışta bellekteki tüm oturumları yazar."""
+        self._stop.set()
+        with self._lock:
+            pending = list(self._sessions.values())
+            self._sessions.clear()
+        for s in pending:
+            try:
+                self.persist(s, ended_at=s.last_ping_at)
+            except Exception as e:
+                print(f"Oturum {s.session_id} yazılırken hata oluştu: {e}")
+
+
+def heatmap_from_runs(sessions: List[Dict]) -> Dict[int, int]:
+    """Oturumların `watched_buckets` aralıklarından kova başına izleyici sayısı üretir."""
+    diff: Dict[int, int] = {}
+    for row in sessions:
+        for start, end in row.get("watched_buckets") or []:
+            diff[start] = diff.get(start, 0) + 1
+            diff[end + 1] = diff.get(end + 1, 0) - 1
+    counts: Dict[int, int] = {}
+    running = 0
+    for bucket in sorted(diff):
+        running += diff[bucket]
+        counts[bucket] = running
+    # Fark dizisinin ara kovalarını doldur
+    filled: Dict[int, int] = {}
+    keys = sorted(counts)
+    for a, b in zip(keys, keys[1:] + [None]):
+        if counts[a] <= 0:
+            continue
+        for bucket in range(a, b if b is not None else a + 1):
+            filled[bucket] = counts[a]
+    return filled
+
+
+def load_heatmap(video_id: str) -> List[Dict]:
+    """
+    Bir videonun heatmap'ini üretir: sıkıştırılmış oturumlar
+    (video_sessions.watched_buckets) + eski ping tabanlı video_ping_heatmap görünümü.
+    """
+    sessions = execute(
+        supabase.table("video_sessions")
+        .select("watched_buckets")
+        .eq("video_id", video_id)
+        .not_.is_("watched_buckets", "null"),
+        idempotent=True,
+    ).data or []
+    legacy = execute(
+        supabase.table("video_ping_heatmap")
+        .select("bucket_10s,views")
+        .eq("video_id", video_id)
+        .order("bucket_10s", desc=False),
+        idempotent=True,
+    ).data or []
+
+    counts = heatmap_from_runs(sessions)
+    for row in legacy:
+        b = row.get("bucket_10s")
+        if b is not None:
+            counts[b] = counts.get(b, 0) + int(row.get("views") or 0)
+    return [{"video_id": video_id, "bucket_10s": b, "views": counts[b]} for b in sorted(counts)]
+
+
+watch_store = WatchSessionStore()
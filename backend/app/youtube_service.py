@@ -1,52 +1,106 @@
 import os
 import requests
 from dotenv import load_dotenv
-from .supabase_client import supabase
+from .supabase_client import supabase, execute
 import re
 from datetime import datetime, timedelta, timezone
+from .resilience import CircuitBreaker, hedged
+from .chapters import chapter_pipeline
 
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+CHANNELS_URL = "https://www.googleapis.com/youtube/v3/channels"
+PLAYLIST_ITEMS_URL = "https://www.googleapis.com/youtube/v3/playlistItems"
+
+# YouTube Data API kota maliyetleri (birim)
+SEARCH_COST = 100
+LIST_COST = 1
+
+# (bağlantı, okuma) zaman aşımları; toplam süre YOUTUBE_DEADLINE ile sınırlı
+YOUTUBE_TIMEOUT = (3.05, 6)
+YOUTUBE_DEADLINE = 8.0
+# Hedge opsiyoneldir: her ikinci search.list denemesi 100 birim kota daha harcar
+YOUTUBE_HEDGE = os.getenv("YOUTUBE_HEDGE", "0") == "1"
+# Açıksa: ilk deneme bu sürede bitmezse ikinci (hedge) deneme başlatılır
+YOUTUBE_HEDGE_DELAY = 1.5
+# Kota aşımı (403/429) ve sunucu hataları upstream bozulması sayılır
+_DEGRADED_STATUSES = {403, 429}
+
+
+class YouTubeError(Exception):
+    """YouTube API'si bozuk/erişilemez yanıt verdi."""
+
+
+def _is_youtube_failure(e: BaseException) -> bool:
+    return isinstance(e, (requests.RequestException, YouTubeError, TimeoutError))
+
+
+youtube_breaker = CircuitBreaker("YouTube", is_failure=_is_youtube_failure)
+
+
+def _yt_get(url: str, params: dict) -> dict:
+    """
+    YouTube API GET çağrısı: zaman aşımı + (YOUTUBE_HEDGE=1 ise) hedge + devre kesici.
+    Devre açıkken aynı parametrelerle alınmış son başarılı yanıt döner.
+    """
+    def call():
+        r = requests.get(url, params=params, timeout=YOUTUBE_TIMEOUT)
+        if r.status_code >= 500 or r.status_code in _DEGRADED_STATUSES:
+            raise YouTubeError(f"{url} -> HTTP {r.status_code}")
+        return r.json()
+
+    cache_key = (url, tuple(sorted((k, str(v)) for k, v in params.items() if k != "key")))
+    fn = call
+    if YOUTUBE_HEDGE:
+        fn = lambda: hedged(call, delay=YOUTUBE_HEDGE_DELAY, deadline=YOUTUBE_DEADLINE)
+    return youtube_breaker.call(fn, cache_key=cache_key)
+
+
+def _iso8601_duration_to_seconds(iso: str) -> int:
+    # PTxHxMxS -> toplam saniye
+    mobj = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", iso or "")
+    if not mobj:
+        return 0
+    h = int(mobj.group(1) or 0)
+    m = int(mobj.group(2) or 0)
+    s = int(mobj.group(3) or 0)
+    return h * 3600 + m * 60 + s
 
 
 def _iso8601_duration_to_hhmmss(iso: str) -> str:
     # PTxHxMxS -> HH:MM:SS
-    h = m = s = 0
-    mobj = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", iso)
-    if mobj:
-        h = int(mobj.group(1) or 0)
-        m = int(mobj.group(2) or 0)
-        s = int(mobj.group(3) or 0)
-    total = h * 3600 + m * 60 + s
+    total = _iso8601_duration_to_seconds(iso)
     hh = total // 3600
     mm = (total % 3600) // 60
     ss = total % 60
-    return f"{hh:d}:{mm:02d}:{ss:02d}" if hh else f"{m:d}:{s:02d}"
+    return f"{hh:d}:{mm:02d}:{ss:02d}" if hh else f"{mm:d}:{ss:02d}"
 
 
-def parse_chapters(description: str):
-    """
-    Video açıklamasından YouTube tarzı chapters (bölümler) çıkarır.
-    """
-    lines = description.splitlines()
-    chapters = []
-    pattern = re.compile(r"^(?P<time>(?:\d+:)?\d{1,2}:\d{2})\s*(?P<title>.+)$")
-    for line in lines:
-        m = pattern.match(line.strip())
-        if m:
-            time_str = m.group("time")
-            title = m.group("title").strip()
-            parts = list(map(int, time_str.split(":")))
-            if len(parts) == 3:
-                seconds = parts[0]*3600 + parts[1]*60 + parts[2]
-            elif len(parts) == 2:
-                seconds = parts[0]*60 + parts[1]
-            else:
-                continue
-            chapters.append({"start_seconds": seconds, "title": title})
-    return chapters
+def hhmmss_to_seconds(value: str) -> int:
+    """"12:34" / "1:02:03" görüntü biçimini saniyeye çevirir (eski kayıtlar için)."""
+    try:
+        parts = [int(p) for p in (value or "").split(":")]
+    except ValueError:
+        return 0
+    total = 0
+    for p in parts:
+        total = total * 60 + p
+    return total
+
+
+def published_epoch(published_at: str):
+    """ISO yayın tarihini Unix zamanına (saniye) çevirir; okunamazsa None."""
+    if not published_at:
+        return None
+    try:
+        dt = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
 
 
 # Anahtar kelimeye göre yeni video olup olmadığını kontrol eden yeni fonksiyon
@@ -66,8 +120,66 @@ def get_new_videos_for_query(query: str, last_checked_at: str = None):
         "key": YOUTUBE_API_KEY
     }
 
-    r = requests.get(SEARCH_URL, params=params)
-    data = r.json()
+    return _search_new_videos(params, last_checked_at)
+
+
+# channel_id -> yüklemeler (uploads) oynatma listesi
+_uploads_playlists: dict = {}
+
+
+def _uploads_playlist(channel_id: str) -> str:
+    """Kanalın yüklemeler listesi: UC... kimliklerinde UU... , diğerlerinde channels.list (1 birim)."""
+    if channel_id in _uploads_playlists:
+        return _uploads_playlists[channel_id]
+    if channel_id.startswith("UC"):
+        playlist_id = "UU" + channel_id[2:]
+    else:
+        data = _yt_get(CHANNELS_URL, {"part": "contentDetails", "id": channel_id, "key": YOUTUBE_API_KEY})
+        items = data.get("items") or [{}]
+        playlist_id = items[0].get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads", "")
+    _uploads_playlists[channel_id] = playlist_id
+    return playlist_id
+
+
+def get_new_videos_for_channel(channel_id: str, last_checked_at: str = None):
+    """
+    Bir kanalın en yeni videolarını yüklemeler listesinden çeker (search.list'in
+    100 birimine karşı 1 birim) ve last_checked_at'ten sonrakileri döndürür.
+    """
+    playlist_id = _uploads_playlist(channel_id)
+    if not playlist_id:
+        return []
+    data = _yt_get(PLAYLIST_ITEMS_URL, {
+        "part": "snippet,contentDetails",
+        "playlistId": playlist_id,
+        "maxResults": 10,
+        "key": YOUTUBE_API_KEY
+    })
+    last_check_datetime = datetime.fromisoformat(last_checked_at.replace("Z", "+00:00")) if last_checked_at else None
+
+    new_videos = []
+    for item in data.get("items", []):
+        sn = item.get("snippet", {})
+        published_at_str = item.get("contentDetails", {}).get("videoPublishedAt") or sn.get("publishedAt")
+        video_id = sn.get("resourceId", {}).get("videoId")
+        if not published_at_str or not video_id:
+            continue  # gizli/silinmiş video
+        published_at = datetime.fromisoformat(published_at_str.replace("Z", "+00:00"))
+        if last_check_datetime and published_at <= last_check_datetime:
+            continue
+        new_videos.append({
+            "video_id": video_id,
+            "title": sn.get("title"),
+            "published_at": published_at_str,
+            "channel_title": sn.get("channelTitle"),
+            "thumbnail": sn.get("thumbnails", {}).get("high", {}).get("url"),
+        })
+    new_videos.sort(key=lambda v: v["published_at"], reverse=True)
+    return new_videos
+
+
+def _search_new_videos(params: dict, last_checked_at: str = None):
+    data = _yt_get(SEARCH_URL, params)
     if "items" not in data:
         return []
 
@@ -94,15 +206,17 @@ def get_new_videos_for_query(query: str, last_checked_at: str = None):
     return new_videos
 
 
-def search_videos(query, language="tr", max_results=9, order="relevance", page_token=None, fresh=False):
+def search_videos(query, language="tr", max_results=9, order="relevance", page_token=None, fresh=False,
+                  published_before=None):
     """
     YouTube araması. fresh=False ise (ve ilk sayfa + relevance) Supabase cache kullanılabilir.
+    published_before (ISO) verilirse sadece o andan önce yayınlanan videolar aranır.
     """
-    use_cache = (not fresh) and (not page_token) and (order == "relevance")
+    use_cache = (not fresh) and (not page_token) and (order == "relevance") and not published_before
 
     # 1) CACHE
     if use_cache:
-        cached = supabase.table("videos").select("*").eq("query", query).execute()
+        cached = execute(supabase.table("videos").select("*").eq("query", query), idempotent=True)
         if cached.data:
             items = [{
                 "video_id": row["video_id"],
@@ -112,6 +226,8 @@ def search_videos(query, language="tr", max_results=9, order="relevance", page_t
                 "published_at": row["published_at"],
                 "channel_title": row.get("channel_title", ""),
                 "duration": row.get("duration"),
+                "duration_seconds": row.get("duration_seconds"),
+                "published_ts": row.get("published_ts"),
                 "chapters": row.get("chapters", []),
             } for row in cached.data]
             return {"items": items, "nextPageToken": None}
@@ -128,21 +244,22 @@ def search_videos(query, language="tr", max_results=9, order="relevance", page_t
     }
     if page_token:
         params["pageToken"] = page_token
+    if published_before:
+        params["publishedBefore"] = published_before
 
-    r = requests.get(SEARCH_URL, params=params)
-    data = r.json()
+    data = _yt_get(SEARCH_URL, params)
     if "items" not in data or not data["items"]:
         return {"items": [], "nextPageToken": None}
 
     # 3) Detay çağrısı ile süre ve snippet
     video_ids = [it["id"]["videoId"] for it in data["items"]]
-    vr = requests.get(VIDEOS_URL, params={
+    vdata = _yt_get(VIDEOS_URL, {
         "part": "contentDetails,snippet",
         "id": ",".join(video_ids),
         "key": YOUTUBE_API_KEY
     })
-    vdata = vr.json()
     durations = {}
+    duration_seconds = {}
     channels = {}
     descriptions = {}
     if "items" in vdata:
@@ -150,9 +267,13 @@ def search_videos(query, language="tr", max_results=9, order="relevance", page_t
             vid = it["id"]
             dur_iso = it.get("contentDetails", {}).get("duration", "PT0S")
             durations[vid] = _iso8601_duration_to_hhmmss(dur_iso)
+            duration_seconds[vid] = _iso8601_duration_to_seconds(dur_iso)
             channels[vid] = it.get("snippet", {}).get("channelTitle", "")
             descriptions[vid] = it.get("snippet", {}).get("description", "")
 
+    # Bölümler: sadece açıklaması yeni/değişmiş videolar ayrıştırılır
+    chapters = chapter_pipeline.extract((vid, descriptions.get(vid, "")) for vid in video_ids)
+
     cleaned = []
     for it in data["items"]:
         vid = it["id"]["videoId"]
@@ -166,13 +287,15 @@ def search_videos(query, language="tr", max_results=9, order="relevance", page_t
             "published_at": sn["publishedAt"],
             "channel_title": channels.get(vid, sn.get("channelTitle", "")),
             "duration": durations.get(vid, None),
-            "chapters": parse_chapters(desc),
+            "duration_seconds": duration_seconds.get(vid),
+            "published_ts": published_epoch(sn["publishedAt"]),
+            "chapters": chapters.get(vid, []),
         })
 
     # 4) Cache'e sadece ilk sayfa + relevance + fresh=False iken yaz
     if use_cache:
         for v in cleaned:
-            supabase.table("videos").upsert({
+            execute(supabase.table("videos").upsert({
                 "query": query,
                 "video_id": v["video_id"],
                 "title": v["title"],
@@ -180,8 +303,10 @@ def search_videos(query, language="tr", max_results=9, order="relevance", page_t
                 "thumbnail": v["thumbnail"],
                 "published_at": v["published_at"],
                 "duration": v.get("duration"),
+                "duration_seconds": v.get("duration_seconds"),
+                "published_ts": v.get("published_ts"),
                 "channel_title": v.get("channel_title"),
                 "chapters": v.get("chapters"),
-            }, on_conflict="video_id").execute()
+            }, on_conflict="video_id"))
 
     return {"items": cleaned, "nextPageToken": data.get("nextPageToken")}
\ No newline at end of file
@@ -0,0 +1,21 @@
+-- videos.updated_at: trend motorunun artımlı okuması için yazma zamanı filigranı
+-- (ayrıca ETag'lerin ucuz (id, updated_at) yolunu etkinleştirir).
+alter table public.videos
+  add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists videos_set_updated_at on public.videos;
+create trigger videos_set_updated_at
+  before update on public.videos
+  for each row execute function public.set_updated_at();
+
+create index if not exists videos_updated_at_idx on public.videos (updated_at);
@@ -0,0 +1,4 @@
+-- video_sessions: ping'lerden katlanan izleme aralıkları (watch_sessions.WatchState.to_row)
+alter table public.video_sessions
+  add column if not exists watched_buckets jsonb,
+  add column if not exists watched_seconds integer;
@@ -0,0 +1,25 @@
+-- videos: /videos süre/tarih filtresi için sayısal kolonlar (video_index.QueryIndex)
+-- Uygulama bu kolonları her upsert'te yazar; bu migration uygulanmadan deploy edilmemelidir.
+alter table public.videos
+  add column if not exists duration_seconds integer,
+  add column if not exists published_ts bigint;
+
+-- Eski satırların geri doldurulması (indeks yine de boş kolonları string'den ayrıştırır)
+update public.videos
+set published_ts = extract(epoch from published_at::timestamptz)::bigint
+where published_ts is null and published_at is not null;
+
+update public.videos v
+set duration_seconds = case array_length(s.parts, 1)
+    when 3 then s.parts[1]::int * 3600 + s.parts[2]::int * 60 + s.parts[3]::int
+    when 2 then s.parts[1]::int * 60 + s.parts[2]::int
+    when 1 then s.parts[1]::int
+  end
+from (
+  select video_id, string_to_array(duration, ':') as parts
+  from public.videos
+  where duration_seconds is null and duration ~ '^\d+(:\d+){0,2}$'
+) s
+where v.video_id = s.video_id;
+
+create index if not exists videos_query_key_published_ts_idx on public.videos (query_key, published_ts);
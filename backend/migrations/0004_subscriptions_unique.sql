@@ -0,0 +1,23 @@
+-- topic_subscriptions / channel_subscriptions: toplu abonelik upsert'lerinin
+-- on_conflict hedefleri (trend_service /subscribe/*/bulk). Upsert bu kısıtlar
+-- olmadan 400 döner; bu migration uygulanmadan deploy edilmemelidir.
+
+-- Önce mevcut tekrarlar temizlenir (her gruptan bir satır kalır)
+delete from public.topic_subscriptions a
+using public.topic_subscriptions b
+where a.ctid > b.ctid
+  and a.user_id = b.user_id
+  and a.channel_id = b.channel_id
+  and a.keyword = b.keyword;
+
+delete from public.channel_subscriptions a
+using public.channel_subscriptions b
+where a.ctid > b.ctid
+  and a.user_id = b.user_id
+  and a.channel_id = b.channel_id;
+
+create unique index if not exists topic_subscriptions_user_channel_keyword_key
+  on public.topic_subscriptions (user_id, channel_id, keyword);
+
+create unique index if not exists channel_subscriptions_user_channel_key
+  on public.channel_subscriptions (user_id, channel_id);
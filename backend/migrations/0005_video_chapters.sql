@@ -0,0 +1,15 @@
+-- video_chapters: açıklamalardan çıkarılan bölümler (chapters.ChapterPipeline)
+-- Uygulama açılışta bu tablodan indeksi kurar ve toplu upsert/silme yapar;
+-- bu migration uygulanmadan deploy edilmemelidir.
+create table if not exists public.video_chapters (
+  video_id text not null,
+  start_seconds integer not null,
+  title text not null,
+  -- Bölümlerin ayrıştırıldığı açıklamanın hash'i (chapters.description_hash)
+  description_hash text not null,
+  primary key (video_id, start_seconds)
+);
+
+-- Eski-satır silmesi (video_id, description_hash) ile filtreler
+create index if not exists video_chapters_video_id_hash_idx
+  on public.video_chapters (video_id, description_hash);
@@ -0,0 +1,26 @@
+-- warmup.rank_topics: başlangıç ısıtması için konu sayımları veritabanında yapılır;
+-- user_topics, topic_subscriptions ve video_sessions tabloları uygulamaya indirilmez.
+-- Kaynak başına (yazım başına gruplanmış) en sık max_rows satır döner; query_key
+-- normalizasyonu ve ağırlıklandırma uygulamada yapılır.
+create or replace function public.warmup_topic_counts(since timestamptz, max_rows integer)
+returns table (source text, topic text, n bigint)
+language sql
+stable
+as $$
+  (select 'user_topics', btrim(t.topic), count(*)
+   from public.user_topics t
+   where coalesce(btrim(t.topic), '') <> ''
+   group by 2 order by 3 desc limit max_rows)
+  union all
+  (select 'topic_subscriptions', btrim(s.keyword), count(*)
+   from public.topic_subscriptions s
+   where coalesce(btrim(s.keyword), '') <> ''
+   group by 2 order by 3 desc limit max_rows)
+  union all
+  (select 'video_sessions', btrim(v.query), count(*)
+   from public.video_sessions v
+   where v.created_at >= since and coalesce(btrim(v.query), '') <> ''
+   group by 2 order by 3 desc limit max_rows)
+$$;
+
+create index if not exists video_sessions_created_at_idx on public.video_sessions (created_at);
@@ -0,0 +1,18 @@
+-- chapters.ChapterPipeline: artımlı geri doldurma ve bölümsüz video işaretleri.
+-- Bölümsüz videolar video_chapters'a start_seconds = -1 (NO_CHAPTERS) olan tek bir
+-- işaret satırıyla yazılır; açıklama hash'i böylece kalıcıdır.
+
+-- Arka plan işlerinin kalıcı filigranları (ör. 'chapters_backfill' -> videos.updated_at)
+create table if not exists public.sync_watermarks (
+  name text primary key,
+  watermark timestamptz not null,
+  updated_at timestamptz not null default now()
+);
+
+drop trigger if exists sync_watermarks_set_updated_at on public.sync_watermarks;
+create trigger sync_watermarks_set_updated_at
+  before update on public.sync_watermarks
+  for each row execute function public.set_updated_at();
+
+-- Geri doldurma (updated_at, video_id) keyset'iyle sayfalar
+create index if not exists videos_updated_at_video_id_idx on public.videos (updated_at, video_id);
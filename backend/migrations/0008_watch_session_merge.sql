@@ -0,0 +1,58 @@
+-- watch_sessions.WatchSessionStore.persist: izlenen aralıklar veritabanında birleştirilir.
+-- Aynı oturumun ping'leri farklı worker'lara gidebilir; her worker kendi aralıklarını
+-- yazar ve son yazan diğerinin kovalarını silmez. Satır kilitlenir (for update),
+-- eşzamanlı iki birleştirme sırayla uygulanır.
+create or replace function public.merge_watch_session(
+  p_id uuid,
+  p_runs jsonb,
+  p_last_t_seconds integer,
+  p_last_ping_time timestamptz,
+  p_ended_at timestamptz,
+  p_bucket_seconds integer
+)
+returns void
+language plpgsql
+as $$
+declare
+  stored jsonb;
+  merged jsonb;
+  watched integer;
+begin
+  select watched_buckets into stored from public.video_sessions where id = p_id for update;
+  if not found then
+    return;
+  end if;
+
+  -- [[başlangıç, bitiş], ...] (bitiş dahil) aralıklarının birleşimi: kovalara aç, ardışıkları grupla
+  with buckets as (
+    select distinct generate_series((r->>0)::int, (r->>1)::int) as b
+    from jsonb_array_elements(coalesce(stored, '[]'::jsonb) || coalesce(p_runs, '[]'::jsonb)) as r
+  ), islands as (
+    select min(b) as lo, max(b) as hi
+    from (select b, b - row_number() over (order by b) as grp from buckets) g
+    group by grp
+  )
+  select coalesce(jsonb_agg(jsonb_build_array(lo, hi) order by lo), '[]'::jsonb),
+         coalesce(sum(hi - lo + 1), 0)::int
+  into merged, watched
+  from islands;
+
+  update public.video_sessions s
+  set watched_buckets = merged,
+      watched_seconds = watched * p_bucket_seconds,
+      -- Konum/son ping: en son ping'i gören worker'ınki kalır
+      last_t_seconds = case
+        when s.last_ping_time is null or p_last_ping_time >= s.last_ping_time then p_last_t_seconds
+        else s.last_t_seconds end,
+      last_ping_time = greatest(s.last_ping_time, p_last_ping_time),
+      ended_at = greatest(s.ended_at, p_ended_at)
+  where s.id = p_id;
+end;
+$$;
+
+-- Eski ping tabanlı heatmap: sayaç kolonu açıkça `views` (kova başına farklı oturum sayısı)
+create or replace view public.video_ping_heatmap as
+select s.video_id, (p.t_seconds / 10)::int as bucket_10s, count(distinct p.session_id)::int as views
+from public.video_pings p
+join public.video_sessions s on s.id = p.session_id
+group by s.video_id, (p.t_seconds / 10)::int;
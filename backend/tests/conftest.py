@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# `app` paketini backend/ altından içe aktar
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# supabase_client içe aktarılırken istemci oluşturur; testler ağa çıkmaz
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test.test.test")
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from fastapi import Request
+
+from app import admission
+from app.admission import TokenBuckets, TooManyRequests
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_then_refill(clock):
+    buckets = TokenBuckets(rate=2.0, burst=3)
+    assert [buckets.take("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("k") == pytest.approx(0.5)
+    clock.now += 0.5
+    assert buckets.take("k") == 0.0
+
+
+def test_keys_are_independent(clock):
+    buckets = TokenBuckets(rate=1.0, burst=1)
+    assert buckets.take("a") == 0.0
+    assert buckets.take("a") > 0
+    assert buckets.take("b") == 0.0
+
+
+def test_hard_cap_evicts_least_recently_used(clock):
+    buckets = TokenBuckets(rate=1.0, burst=2, max_keys=3)
+    for key in ("a", "b", "c"):
+        buckets.take(key)
+        clock.now += 0.01
+    buckets.take("a")  # "a" yeniden kullanıldı; en eski artık "b"
+    buckets.take("d")
+    assert len(buckets) == 3
+    assert list(buckets._state) == ["c", "a", "d"]
+
+
+def test_size_never_exceeds_cap_under_a_flood_of_new_keys(clock):
+    buckets = TokenBuckets(rate=1.0, burst=10, max_keys=100)
+    for i in range(1000):
+        buckets.take(f"k{i}")
+        assert len(buckets) <= 100
+    assert len(buckets) == 100
+
+
+def test_idle_keys_are_swept_from_the_front_only(clock):
+    buckets = TokenBuckets(rate=1.0, burst=2)  # 2 sn sonra boşta sayılır
+    buckets.take("old")
+    clock.now += 1.5
+    buckets.take("fresh")
+    clock.now += 1.0
+    buckets.take("new")
+    assert list(buckets._state) == ["fresh", "new"]
+
+
+def test_swept_key_comes_back_with_a_full_bucket(clock):
+    buckets = TokenBuckets(rate=1.0, burst=2)
+    buckets.take("k")
+    buckets.take("k")
+    assert buckets.take("k") > 0
+    clock.now += 5
+    buckets.take("other")
+    assert "k" not in buckets._state
+    assert buckets.take("k") == 0.0
+
+
+def test_take_stays_cheap_with_a_full_cap():
+    buckets = TokenBuckets(rate=1.0, burst=10, max_keys=100_000)
+    for i in range(100_000):
+        buckets.take(f"k{i}")
+    started = time.perf_counter()
+    for i in range(10_000):
+        buckets.take(f"new{i}")
+    # Tam tarama (O(n)) her çağrıda milisaniyeler sürer; burada toplam 1 sn bile çok cömert
+    assert time.perf_counter() - started < 1.0
+    assert len(buckets) == 100_000
+
+
+def _request(host):
+    return Request({"type": "http", "method": "POST", "path": "/video/ping", "headers": [], "client": (host, 1234)})
+
+
+def test_client_ip_reads_the_socket_peer():
+    assert admission.client_ip(_request("10.0.0.7")) == "10.0.0.7"
+    assert admission.client_ip(Request({"type": "http", "method": "POST", "path": "/", "headers": []})) == ""
+
+
+def test_admit_rejects_with_retry_after(monkeypatch, clock):
+    monkeypatch.setitem(admission._buckets, "ping_ip", TokenBuckets(rate=1.0, burst=1))
+    with admission.admit("ping_ip", "10.0.0.7"):
+        pass
+    with pytest.raises(TooManyRequests) as exc:
+        with admission.admit("ping_ip", "10.0.0.7"):
+            pass
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
@@ -0,0 +1,31 @@
+from fastapi import Request, Response
+
+from app import http_cache
+
+
+def _request(path, etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers})
+
+
+def _etag(path, rows, cache_control):
+    response = Response()
+    assert http_cache.conditional(_request(path), response, rows, cache_control=cache_control) is None
+    assert "last-modified" not in response.headers
+    return response.headers["etag"]
+
+
+def test_public_validator_short_circuits_repeat_requests():
+    etag = _etag("/video/heatmap", [{"bucket": 1, "count": 3}], http_cache.PUBLIC_CACHE)
+    not_modified = http_cache.precheck(_request("/video/heatmap", etag))
+    assert not_modified is not None and not_modified.status_code == 304
+
+
+def test_private_responses_are_always_revalidated_against_data():
+    etag = _etag("/video/notes-all", [{"id": 1, "note_text": "a"}], http_cache.PRIVATE_CACHE)
+    # Başka bir worker veriyi değiştirmiş olabilir: hafızadan 304 verilmez
+    assert http_cache.precheck(_request("/video/notes-all", etag)) is None
+    changed = http_cache.conditional(_request("/video/notes-all", etag), Response(), [{"id": 1, "note_text": "b"}])
+    assert changed is None
+    same = http_cache.conditional(_request("/video/notes-all", etag), Response(), [{"id": 1, "note_text": "a"}])
+    assert same.status_code == 304
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from app import resilience
+from app.resilience import hedged
+
+
+class Attempts:
+    """Her çağrıda sıradaki davranışı (süre, sonuç veya hata) uygulayan sahte okuma."""
+
+    def __init__(self, *plans):
+        self.plans = list(plans)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            seconds, outcome = self.plans[min(self.calls, len(self.plans) - 1)]
+            self.calls += 1
+        time.sleep(seconds)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _timed(fn, **kw):
+    started = time.monotonic()
+    result = hedged(fn, **kw)
+    return result, time.monotonic() - started
+
+
+def test_fast_first_attempt_sends_no_hedge():
+    fn = Attempts((0.0, "fast"))
+    result, _ = _timed(fn, delay=0.2, deadline=2.0)
+    time.sleep(0.3)
+    assert result == "fast"
+    assert fn.calls == 1
+
+
+def test_slow_first_attempt_loses_to_hedge():
+    fn = Attempts((1.0, "slow"), (0.0, "hedge"))
+    result, took = _timed(fn, delay=0.1, deadline=2.0)
+    assert result == "hedge"
+    assert took < 0.5
+    assert fn.calls == 2
+
+
+def test_failed_first_attempt_falls_back_to_hedge():
+    fn = Attempts((0.3, ValueError("boom")), (0.0, "hedge"))
+    result, _ = _timed(fn, delay=0.1, deadline=2.0)
+    assert result == "hedge"
+
+
+def test_all_attempts_failing_raises_first_error():
+    fn = Attempts((0.2, ValueError("first")), (0.2, KeyError("second")))
+    with pytest.raises(ValueError, match="first"):
+        hedged(fn, delay=0.1, deadline=2.0)
+
+
+def test_deadline_bounds_the_wait():
+    fn = Attempts((1.0, "slow"))
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        hedged(fn, delay=0.05, deadline=0.2)
+    assert time.monotonic() - started < 0.5
+
+
+def test_runs_inline_without_hedge_when_no_slot_is_free(monkeypatch):
+    monkeypatch.setattr(resilience, "_hedge_slots", threading.BoundedSemaphore(1))
+    resilience._hedge_slots.acquire()
+    fn = Attempts((0.2, "inline"), (0.0, "hedge"))
+    assert hedged(fn, delay=0.05, deadline=2.0) == "inline"
+    assert fn.calls == 1
+
+
+def test_slot_is_released_after_both_attempts_finish():
+    fn = Attempts((0.3, "slow"), (0.0, "hedge"))
+    hedged(fn, delay=0.05, deadline=2.0)
+    # Önceki testlerin geride kalan denemeleri de bitince tüm yuvalar boş olmalı
+    # (BoundedSemaphore fazladan release'te hata verir)
+    taken = [resilience._hedge_slots.acquire(timeout=3) for _ in range(resilience.HEDGE_MAX_CONCURRENCY)]
+    assert all(taken)
+    assert not resilience._hedge_slots.acquire(blocking=False)
+    for _ in taken:
+        resilience._hedge_slots.release()
@@ -0,0 +1,42 @@
+import httpx
+import pytest
+
+from app import supabase_client
+from app.resilience import UpstreamUnavailable
+from app.supabase_client import execute, supabase
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    breaker = supabase_client.CircuitBreaker("Supabase", is_failure=supabase_client._is_supabase_failure)
+    monkeypatch.setattr(supabase_client, "supabase_breaker", breaker)
+    return breaker
+
+
+def _query(page):
+    return supabase.table("videos").select("video_id").eq("query_key", "seo").range(page * 10, page * 10 + 9)
+
+
+def _down():
+    raise httpx.ConnectError("down")
+
+
+def test_idempotent_read_falls_back_to_last_good_response():
+    ok = _query(0)
+    ok.execute = lambda: "fresh"
+    assert execute(ok, idempotent=True) == "fresh"
+
+    failing = _query(0)
+    failing.execute = _down
+    assert execute(failing, idempotent=True) == "fresh"
+
+
+def test_fallback_key_distinguishes_pages():
+    ok = _query(0)
+    ok.execute = lambda: "page-0"
+    execute(ok, idempotent=True)
+
+    other_page = _query(1)
+    other_page.execute = _down
+    with pytest.raises(UpstreamUnavailable):
+        execute(other_page, idempotent=True)
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import video_catalog
+from app.resilience import UpstreamUnavailable
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _video(i):
+    return {"video_id": f"v{i:03d}", "published_at": (T0 - timedelta(hours=i)).isoformat()}
+
+
+class FakeCatalog:
+    """`videos` tablosu + tarih sıralı YouTube araması için bellek içi sahte."""
+
+    def __init__(self, cached, youtube, available=True):
+        self.rows = {v["video_id"]: dict(v) for v in cached}
+        self.youtube = sorted(youtube, key=lambda v: v["published_at"], reverse=True)
+        self.available = available
+        self.searches = []
+
+    def keyset_query(self, qk, cursor, limit, cols):
+        rows = sorted(self.rows.values(), key=lambda r: (r["published_at"], r["video_id"]), reverse=True)
+        if cursor:
+            rows = [r for r in rows if (r["published_at"], r["video_id"]) < cursor]
+        return rows[: limit + 1]
+
+    def search_videos(self, query, language, limit, order, page_token, fresh=False, published_before=None):
+        self.searches.append({"order": order, "page_token": page_token, "published_before": published_before})
+        if not self.available:
+            raise UpstreamUnavailable("YouTube")
+        found = [v for v in self.youtube if not published_before or v["published_at"] < published_before]
+        start = int(page_token or 0)
+        items = found[start:start + limit]
+        more = start + limit < len(found)
+        return {"items": items, "nextPageToken": str(start + limit) if more else None}
+
+    def cache_items(self, query, items):
+        for it in items:
+            self.rows[it["video_id"]] = dict(it)
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    def install(cached, youtube, available=True):
+        fake = FakeCatalog(cached, youtube, available)
+        monkeypatch.setattr(video_catalog, "_keyset_query", fake.keyset_query)
+        monkeypatch.setattr(video_catalog, "search_videos", fake.search_videos)
+        monkeypatch.setattr(video_catalog, "cache_items", fake.cache_items)
+        video_catalog._pages.clear()
+        return fake
+    return install
+
+
+def _all_pages(limit):
+    seen, token = [], None
+    for _ in range(50):
+        page = video_catalog.fetch_page("seo", token, limit)
+        seen.extend(r["video_id"] for r in page["items"])
+        token = page["nextPageToken"]
+        if not token:
+            return seen
+    raise AssertionError("sayfalama bitmedi")
+
+
+def test_fallthrough_continues_after_cursor(catalog):
+    videos = [_video(i) for i in range(10)]
+    fake = catalog(cached=videos[:3], youtube=videos)
+
+    assert _all_pages(limit=3) == [v["video_id"] for v in videos]
+    # Her YouTube çağrısı imlecin yayın zamanından öncesini ister
+    cursored = [s for s in fake.searches if s["page_token"] is None and s["published_before"]]
+    assert cursored and all(s["order"] == "date" for s in fake.searches)
+
+
+def test_fallthrough_skips_already_cached_rows(catalog):
+    videos = [_video(i) for i in range(8)]
+    catalog(cached=videos[:5], youtube=videos)
+
+    first = video_catalog.fetch_page("seo", None, 4, allow_fetch=False)
+    second = video_catalog.fetch_page("seo", first["nextPageToken"], 4)
+    assert [r["video_id"] for r in second["items"]] == [v["video_id"] for v in videos[4:8]]
+
+
+def test_youtube_unavailable_keeps_cursor(catalog):
+    videos = [_video(i) for i in range(6)]
+    catalog(cached=videos[:4], youtube=videos, available=False)
+
+    first = video_catalog.fetch_page("seo", None, 4, allow_fetch=False)
+    second = video_catalog.fetch_page("seo", first["nextPageToken"], 4)
+    assert second["items"] == []
+    assert second["nextPageToken"] is None
+
+    page = video_catalog.fetch_page("seo", None, 3)
+    assert [r["video_id"] for r in page["items"]] == [v["video_id"] for v in videos[:3]]
+    assert page["nextPageToken"] is not None
+
+
+def test_stops_when_youtube_has_nothing_older(catalog):
+    videos = [_video(i) for i in range(3)]
+    catalog(cached=videos, youtube=videos)
+
+    page = video_catalog.fetch_page("seo", None, 3)
+    assert [r["video_id"] for r in page["items"]] == [v["video_id"] for v in videos]
+    # YouTube bu sayfadan eskisini döndürmediği için imleç verilmez
+    assert page["nextPageToken"] is None
@@ -0,0 +1,103 @@
+import pytest
+
+from app import video_index
+from app.video_index import QueryIndex
+
+# (video_id, published_ts, duration_seconds)
+ROWS = [
+    ("a", 100, 300),
+    ("b", 200, 60),
+    ("c", 200, 900),
+    ("d", 300, 60),
+    ("e", 400, 1800),
+]
+
+
+@pytest.fixture
+def index():
+    return QueryIndex([
+        {"video_id": vid, "published_ts": ts, "duration_seconds": dur} for vid, ts, dur in ROWS
+    ])
+
+
+def test_sorts_with_video_id_tie_break(index):
+    assert index.query(sort="newest", limit=10) == (["e", "d", "c", "b", "a"], False)
+    assert index.query(sort="oldest", limit=10) == (["a", "b", "c", "d", "e"], False)
+    assert index.query(sort="shortest", limit=10) == (["b", "d", "a", "c", "e"], False)
+    assert index.query(sort="longest", limit=10) == (["e", "c", "a", "d", "b"], False)
+
+
+def test_range_bounds_are_inclusive(index):
+    ids, _ = index.query(published_after=200, published_before=300, sort="oldest", limit=10)
+    assert ids == ["b", "c", "d"]
+    ids, _ = index.query(min_duration=60, max_duration=300, sort="shortest", limit=10)
+    assert ids == ["b", "d", "a"]
+
+
+def test_filter_on_the_other_key_is_applied_by_scan(index):
+    ids, _ = index.query(min_duration=600, sort="newest", limit=10)
+    assert ids == ["e", "c"]
+    ids, _ = index.query(published_after=250, sort="longest", limit=10)
+    assert ids == ["e", "d"]
+
+
+def test_offset_pages_cover_every_match_once(index):
+    seen, offset, more = [], 0, True
+    while more:
+        page, more = index.query(sort="newest", offset=offset, limit=2)
+        seen += page
+        offset += len(page)
+    assert seen == ["e", "d", "c", "b", "a"]
+    assert index.query(sort="newest", offset=3, limit=2) == (["b", "a"], False)
+
+
+def test_empty_range(index):
+    assert index.query(published_after=500, limit=10) == ([], False)
+    assert len(QueryIndex([])) == 0
+    assert QueryIndex([]).query(limit=5) == ([], False)
+
+
+def test_string_fields_fill_in_missing_numeric_columns():
+    index = QueryIndex([
+        {"video_id": "x", "published_at": "1970-01-01T00:01:40Z", "duration": "1:02:03"},
+        {"video_id": "y", "published_ts": 50, "duration_seconds": 10},
+    ])
+    assert index.query(sort="longest", limit=10) == (["x", "y"], False)
+    assert index.query(min_duration=3723, max_duration=3723, limit=10) == (["x"], False)
+    assert index.query(published_after=100, published_before=100, limit=10) == (["x"], False)
+
+
+class FakeVideos:
+    """`videos` tablosunu sayfalayan sahte sorgu; sırasız okumayı reddeder."""
+
+    def __init__(self, n):
+        self.rows = [{"video_id": f"v{i:04d}", "published_ts": i, "duration_seconds": i} for i in range(n)]
+        self.ordered = False
+
+    def table(self, name):
+        self.ordered = False
+        return self
+
+    def select(self, cols):
+        return self
+
+    def eq(self, col, value):
+        return self
+
+    def order(self, col):
+        self.ordered = col == "video_id"
+        return self
+
+    def range(self, start, end):
+        assert self.ordered, "sayfalama sabit bir sıra gerektirir"
+        self.page = self.rows[start:end + 1]
+        return self
+
+
+def test_load_pages_through_all_rows_in_a_stable_order(monkeypatch):
+    fake = FakeVideos(2 * video_index.PAGE_SIZE + 5)
+    monkeypatch.setattr(video_index, "supabase", fake)
+    monkeypatch.setattr(video_index, "execute", lambda q, **kw: type("R", (), {"data": q.page})())
+    index = video_index._load("seo")
+    assert len(index) == len(fake.rows)
+    assert sorted(index.ids) == [r["video_id"] for r in fake.rows]
@@ -0,0 +1,93 @@
+import pytest
+
+from app import watch_sessions
+from app.watch_sessions import BUCKET_SECONDS, MAX_T_SECONDS, WatchState, heatmap_from_runs, runs_from_bitmap
+
+
+def _state(*positions):
+    state = WatchState("s1", "v1")
+    for t in positions:
+        state.mark(t)
+    return state
+
+
+def test_pings_fold_into_bucket_runs():
+    state = _state(0, 5, 10, 25, 60, 70)
+    assert state.runs() == [[0, 2], [6, 7]]
+    assert state.watched_seconds() == 5 * BUCKET_SECONDS
+    assert state.last_position == 70
+
+
+def test_runs_cross_byte_boundaries():
+    state = _state(*(b * BUCKET_SECONDS for b in range(6, 11)))
+    assert state.runs() == [[6, 10]]
+
+
+def test_positions_are_clamped():
+    state = _state(-30, MAX_T_SECONDS + 500)
+    last = MAX_T_SECONDS // BUCKET_SECONDS
+    assert state.runs() == [[0, 0], [last, last]]
+
+
+def test_merge_runs_unions_with_stored_runs():
+    state = _state(30, 40)
+    state.merge_runs([[0, 1], [4, 5], [9, 9]])
+    assert state.runs() == [[0, 1], [3, 5], [9, 9]]
+    # Aynı aralıkları tekrar birleştirmek sonucu değiştirmez
+    state.merge_runs([[0, 1], [4, 5]])
+    assert state.runs() == [[0, 1], [3, 5], [9, 9]]
+
+
+def test_merge_runs_ignores_out_of_range_buckets():
+    state = WatchState("s1")
+    last = MAX_T_SECONDS // BUCKET_SECONDS
+    state.merge_runs([[-5, 1], [last - 1, last + 100]])
+    assert state.runs() == [[0, 1], [last - 1, last]]
+
+
+def test_bitmap_round_trips_through_runs():
+    state = _state(0, 20, 30, 100, 170, 180, 190)
+    copy = WatchState("s2")
+    copy.merge_runs(state.runs())
+    assert copy.bitmap == state.bitmap
+    assert runs_from_bitmap(bytearray()) == []
+
+
+def test_heatmap_counts_sessions_per_bucket():
+    sessions = [
+        {"watched_buckets": [[0, 2]]},
+        {"watched_buckets": [[1, 3], [6, 6]]},
+        {"watched_buckets": None},
+    ]
+    assert heatmap_from_runs(sessions) == {0: 1, 1: 2, 2: 2, 3: 1, 6: 1}
+
+
+class FakeRpc:
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return self
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = FakeRpc()
+    monkeypatch.setattr(watch_sessions, "supabase", fake)
+    monkeypatch.setattr(watch_sessions, "execute", lambda query, **kw: None)
+    return watch_sessions.WatchSessionStore(), fake
+
+
+def test_persist_sends_runs_for_a_database_side_merge(store):
+    sessions, fake = store
+    sessions.start_session("s1", "v1")
+    sessions.record("s1", 0)
+    sessions.record("s1", 15)
+    sessions.persist(sessions.pop("s1"))
+    ((name, params),) = fake.calls
+    assert name == "merge_watch_session"
+    assert params["p_id"] == "s1"
+    assert params["p_runs"] == [[0, 1]]
+    assert params["p_last_t_seconds"] == 15
+    assert params["p_bucket_seconds"] == BUCKET_SECONDS